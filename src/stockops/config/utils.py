@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from stockops.config import eodhd_config  # , add additional providers here as needed
 
 _CONFIG_MAP = {  # , add additional providers here as needed
@@ -17,3 +19,9 @@ class ProviderConfig:
             return _CONFIG_MAP[self.provider]
         except KeyError as err:
             raise ValueError(f"Unsupported provider: {self.provider!r}. Supported: {list(_CONFIG_MAP)}") from err
+
+
+@lru_cache(maxsize=32)
+def get_provider_config(provider: str, exchange: str = "US") -> ProviderConfig:
+    """Shared ProviderConfig per (provider, exchange); instances are read-only after construction."""
+    return ProviderConfig(provider, exchange)
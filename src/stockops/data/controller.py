@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from typing import cast
 
 from stockops.data.historical.base_historical_service import AbstractHistoricalService
 from stockops.data.streaming.base_streaming_service import AbstractStreamingService
@@ -9,7 +11,7 @@ logger = logging.getLogger(__name__)
 class Controller:
     def __init__(
         self,
-        command: dict,
+        command: dict | list[dict],
         streaming_service: AbstractStreamingService | None = None,
         historical_service: AbstractHistoricalService | None = None,
     ):
@@ -20,16 +22,23 @@ class Controller:
         if bool(self.streaming_service) == bool(self.historical_service):
             raise ValueError("Exactly one of streaming_service or historical_service must be provided.")
 
+        if isinstance(self.command, list) and self.streaming_service:
+            raise ValueError("A list of commands is only supported for historical_service.")
+
     def __call__(self) -> None:
         logger.info("Controller: received command %r", self.command)
         try:
             if self.streaming_service:
                 logger.info("Starting streaming task")
-                self.streaming_service.start_stream(self.command)
+                self.streaming_service.start_stream(cast(dict, self.command))
 
             elif self.historical_service:
-                logger.info("Starting historical task")
-                self.historical_service.start_historical_task(self.command)
+                if isinstance(self.command, list):
+                    logger.info("Starting %d historical tasks concurrently", len(self.command))
+                    asyncio.run(self.historical_service.run_many(self.command))
+                else:
+                    logger.info("Starting historical task")
+                    self.historical_service.start_historical_task(self.command)
 
             else:
                 # Defensive fallback; should never happen due to __init__ check
@@ -1,6 +1,7 @@
 import logging
+from collections.abc import Mapping, Sequence
 from pathlib import Path
-from zoneinfo import ZoneInfo
+from typing import Any
 
 import pandas as pd
 
@@ -8,7 +9,13 @@ from stockops.config import config
 from stockops.config import utils as cfg_utils
 from stockops.data.database.sql_db import SQLiteReader
 from stockops.data.database.utils import set_ts_col
-from stockops.data.utils import get_filenames_for_dates, tzstr_to_utcts, validate_isodatestr, validate_utc_ts
+from stockops.data.utils import (
+    get_filenames_for_dates,
+    get_zoneinfo,
+    tzstr_to_utcts,
+    validate_isodatestr,
+    validate_utc_ts,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +25,16 @@ class ReadProcess:
         self.provider = provider
         self.data_type = data_type
         self.exchange = exchange
-        self.cfg_utils = cfg_utils.ProviderConfig(provider, exchange)
-        self.tz = ZoneInfo(self.cfg_utils.tz_str)
+        self.cfg_utils = cfg_utils.get_provider_config(provider, exchange)
+        self.tz = get_zoneinfo(self.cfg_utils.tz_str)
 
-    def read_sql(self, ticker: str, interval: str, start_date: str, end_date: str) -> list[dict]:
-        """query sql database by date range, interval, and ticker; return raw data as list[dict]"""
+    def read_sql(self, ticker: str, interval: str, start_date: str, end_date: str) -> list[Mapping[str, Any]]:
+        """query sql database by date range, interval, and ticker; return raw data as a list of row mappings"""
         if self.provider == "EODHD":
             return self.read_eodhd(ticker, interval, start_date, end_date)
         raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def read_eodhd(self, ticker: str, interval: str, start_date: str, end_date: str) -> list[dict]:
+    def read_eodhd(self, ticker: str, interval: str, start_date: str, end_date: str) -> list[Mapping[str, Any]]:
         def convert_to_table_ts(datestr: str, precision: str = "s") -> int:
             if self.data_type == "historical_intraday":
                 ts = tzstr_to_utcts(datestr, "%Y-%m-%d %H:%M", self.tz)
@@ -56,7 +63,7 @@ class ReadProcess:
         self.ts_col = set_ts_col(self.provider, self.data_type)
         sql_reader = SQLiteReader(self.ts_col)
 
-        rows: list[dict] = sql_reader.read_dt_range(db_files, ticker, interval, start, end)
+        rows = sql_reader.read_dt_range(db_files, ticker, interval, start, end)
 
         if not rows:
             raise RuntimeError(
@@ -69,7 +76,7 @@ class ReadProcess:
 
         return rows
 
-    def get_df(self, data: list[dict]) -> pd.DataFrame:
+    def get_df(self, data: Sequence[Mapping[str, Any]]) -> pd.DataFrame:
         def set_index(df: pd.DataFrame) -> pd.DataFrame:
             if self.provider == "EODHD":
                 if self.data_type == "historical_interday":
@@ -3,7 +3,8 @@ from __future__ import annotations
 import json
 import logging
 import sqlite3
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterator, Mapping
 from decimal import Decimal
 from numbers import Integral, Real
 from pathlib import Path
@@ -18,18 +19,111 @@ from stockops.data.utils import normalize_ts_to_seconds, validate_isodatestr
 logger = logging.getLogger(__name__)
 
 IndexMode = ["historical_intraday", "streaming", "historical_interday"]
+MAX_OPEN_DBS = 8  # writer connections kept open at once (LRU), e.g. several monthly/daily files in one batch
+READ_CHUNK_ROWS = 10_000  # rows per fetchmany() when streaming reads
 # historical_intraday: ("timestamp_UTC_s", "interval")
 # streaming: ("timestamp_UTC_ms",)
 # historical_interday: ("date", "interval")
 
+# Values are bound natively; teach sqlite3 the non-builtin types infer_sqlite_affinity already declares columns for
+_NP_SCALARS: tuple[type[np.generic], ...] = (
+    np.bool_,
+    np.int8,
+    np.int16,
+    np.int32,
+    np.int64,
+    np.uint8,
+    np.uint16,
+    np.uint32,
+    np.uint64,
+    np.float16,
+    np.float32,
+    np.float64,
+)
+
+
+def _np_scalar_to_py(val: np.generic) -> int | float:
+    return val.item()
+
+
+for _np_type in _NP_SCALARS:
+    sqlite3.register_adapter(_np_type, _np_scalar_to_py)
+sqlite3.register_adapter(Decimal, str)  # NUMERIC affinity stores the text as a number
+
+# Stats upserts: one statement per stats row. Bounds merge with NULL-aware min/max (a NULL side never wins),
+# so a batch without timestamps/dates leaves the stored bounds untouched.
+_STATS_MERGE_SQL = (
+    "row_count = row_count + excluded.row_count, "
+    "min_timestamp_utc_s = COALESCE("
+    "  min(min_timestamp_utc_s, excluded.min_timestamp_utc_s), min_timestamp_utc_s, excluded.min_timestamp_utc_s), "
+    "max_timestamp_utc_s = COALESCE("
+    "  max(max_timestamp_utc_s, excluded.max_timestamp_utc_s), max_timestamp_utc_s, excluded.max_timestamp_utc_s), "
+    "min_date = COALESCE(min(min_date, excluded.min_date), min_date, excluded.min_date), "
+    "max_date = COALESCE(max(max_date, excluded.max_date), max_date, excluded.max_date), "
+    "updated_utc = CURRENT_TIMESTAMP"
+)
+_TABLE_STATS_UPSERT_SQL = (
+    'INSERT INTO "__table_stats__"'
+    "(table_name, row_count, min_timestamp_utc_s, max_timestamp_utc_s, min_date, max_date) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    f"ON CONFLICT(table_name) DO UPDATE SET {_STATS_MERGE_SQL}"
+)
+_INTERVAL_STATS_UPSERT_SQL = (
+    'INSERT INTO "__interval_stats__"'
+    "(table_name, interval, row_count, min_timestamp_utc_s, max_timestamp_utc_s, min_date, max_date) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    f"ON CONFLICT(table_name, interval) DO UPDATE SET {_STATS_MERGE_SQL}"
+)
+
+
+def _column_affinity(declared: str) -> str:
+    """SQLite's rules for the affinity of a declared column type (datatype3.html, section 3.1)."""
+    t = declared.upper()
+    if "INT" in t:
+        return "INTEGER"
+    if "CHAR" in t or "CLOB" in t or "TEXT" in t:
+        return "TEXT"
+    if not t or "BLOB" in t:
+        return "BLOB"
+    if "REAL" in t or "FLOA" in t or "DOUB" in t:
+        return "REAL"
+    return "NUMERIC"
+
+
+# Affinity -> Python types it stores unchanged as far as == is concerned (None = any type); anything else is converted
+_NUMERIC_KEEPS: frozenset[type] = frozenset({int, float, bool, bytes, type(None)})
+_AFFINITY_KEEPS: dict[str, frozenset[type] | None] = {
+    "INTEGER": _NUMERIC_KEEPS,
+    "REAL": _NUMERIC_KEEPS,
+    "NUMERIC": _NUMERIC_KEEPS,
+    "TEXT": frozenset({str, bytes, type(None)}),
+    "BLOB": None,
+}
+
+
+def _affinity_satisfies(declared: str, want: str | None) -> bool:
+    """A declared type already fits the target; REAL columns are never narrowed back to INTEGER."""
+    return declared == want or (declared == "REAL" and want == "INTEGER")
+
 
 class SQLiteWriter:
-    def __init__(self):
+    def __init__(self, perf_pragmas: bool = True, max_open_dbs: int = MAX_OPEN_DBS):
+        # perf_pragmas: in-memory temp store, 64 MiB page cache and 256 MiB mmap per connection
+        self.perf_pragmas = perf_pragmas
+        self.max_open_dbs = max(1, max_open_dbs)
+        # One connection per db file, least recently used first; _conn/_cursor point at the active one
+        self._pool: OrderedDict[Path, tuple[sqlite3.Connection, sqlite3.Cursor]] = OrderedDict()
         self._conn: sqlite3.Connection | None = None
         self._cursor: sqlite3.Cursor | None = None
         self._open_for: tuple[Path, str] | None = None
         self._table_meta: dict[tuple[Path, str], dict[str, Any]] = {}
         self._open_db: Path | None = None
+        # (db_path, table) -> (schema signature, table columns, declared types) for tables already verified/evolved
+        self._schema_cache: dict[tuple[Path, str], tuple[tuple[Any, ...], list[str], dict[str, str]]] = {}
+        # (db_path, table) whose indexes are known current, so pool reopens skip the index DDL
+        self._indexed: set[tuple[Path, str]] = set()
+        # (table, index cols, data cols) -> (subset SELECT, insert column order, INSERT); SQL text only, db-agnostic
+        self._stmt_cache: dict[tuple[str, tuple[str, ...], tuple[str, ...]], tuple[str, list[str], str]] = {}
 
     def update_min_max(self, val, mn, mx):
         """Update min/max with a single comparison each (no branching)."""
@@ -95,7 +189,7 @@ class SQLiteWriter:
             have_u = existing_decl.get(col, "")
             if col in existing_decl:
                 # Rewrite if declared type is empty (NONE) or TEXT/NUMERIC and differs from target.
-                if have_u != want:
+                if not _affinity_satisfies(have_u, want):
                     to_upgrade[col] = want
 
         if not to_upgrade:
@@ -137,14 +231,7 @@ class SQLiteWriter:
                 cur.execute(f'ALTER TABLE "{tmp_name}" RENAME TO "{table_name}"')
 
                 # 4) Recreate indexes
-                cur.execute(
-                    f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_" ON "{table_name}" '
-                    f"({', '.join(f'"{c}"' for c in idx_cols)})"
-                )
-                cur.execute(
-                    f'CREATE UNIQUE INDEX IF NOT EXISTS "ux_{table_name}_ver" '
-                    f'ON "{table_name}" ({", ".join(f'"{c}"' for c in idx_cols)},"version")'
-                )
+                self._ensure_indexes(cur, table_name, idx_cols)
                 conn.commit()
             except Exception:
                 conn.rollback()
@@ -212,7 +299,7 @@ class SQLiteWriter:
         if db_just_opened:
             try:
                 # mimic old code: get metadata from cfg_utils
-                meta = cfg_utils.ProviderConfig(provider, exchange).cfg.EXCHANGE_METADATA[exchange]
+                meta = cfg_utils.get_provider_config(provider, exchange).cfg.EXCHANGE_METADATA[exchange]
             except Exception:
                 logger.warning("Skipping provider metadata seeding; parse/lookup failed.", exc_info=True)
                 meta = {}
@@ -240,25 +327,111 @@ class SQLiteWriter:
             cur.execute(f'CREATE TABLE "{table_name}" ({", ".join(col_defs)})')
 
             # indexes
+            self._ensure_indexes(cur, table_name, idx_cols)
+
+    def _stored_forms(
+        self, cur: sqlite3.Cursor, declared_types: list[str], rows: list[tuple[Any, ...]]
+    ) -> list[tuple[Any, ...]]:
+        """
+        rows as SQLite would store them in columns with these declared types, i.e. with column affinity applied
+        (a number bound to a TEXT column becomes text, numeric text in a REAL column becomes a float, ...).
+        Values whose type no affinity changes are the common case and skip SQLite entirely; otherwise the rows
+        round-trip through a TEMP table with the same declarations. A row that cannot be bound is returned as-is.
+        """
+        fits = [_AFFINITY_KEEPS[_column_affinity(t)] for t in declared_types]
+        if all(ok is None or type(v) in ok for row in rows for v, ok in zip(row, fits, strict=True)):
+            return rows
+
+        cols_sql = ", ".join(f'"c{i}" {t}' for i, t in enumerate(declared_types))
+        placeholders = ", ".join("?" for _ in declared_types)
+        cur.execute('DROP TABLE IF EXISTS temp."__stored_forms__"')
+        cur.execute(f'CREATE TEMP TABLE "__stored_forms__" ({cols_sql})')
+        try:
+            out: list[tuple[Any, ...]] = []
+            for row in rows:
+                try:
+                    cur.execute(f'INSERT INTO temp."__stored_forms__" VALUES ({placeholders})', row)
+                except (sqlite3.Error, OverflowError):
+                    out.append(row)  # fails at the real insert too, and is skipped there
+                    continue
+                cur.execute('SELECT * FROM temp."__stored_forms__" WHERE rowid = last_insert_rowid()')
+                out.append(tuple(cur.fetchone()))
+            return out
+        finally:
+            cur.execute('DROP TABLE temp."__stored_forms__"')
+
+    def _upgrade_indexes(
+        self, conn: sqlite3.Connection, cur: sqlite3.Cursor, table_name: str, idx_cols: list[str]
+    ) -> bool:
+        """
+        _ensure_indexes() for a table that already existed, in its own write transaction (a legacy table may need
+        an index built over all its rows). Skipped when the DB is busy, like schema migration; False = retry later.
+        """
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._ensure_indexes(cur, table_name, idx_cols)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        except sqlite3.OperationalError as e:
+            msg = str(e).lower()
+            if "locked" in msg or "busy" in msg:
+                logger.debug("Skipping index upgrade for %s (db is busy). Will retry later.", table_name)
+                return False
+            raise
+        return True
+
+    def _ensure_indexes(self, cur: sqlite3.Cursor, table_name: str, idx_cols: list[str]) -> None:
+        """
+        ux_{table}_ver (index cols + version) serves the dedup lookups and ts-leading range scans. Interval-keyed
+        tables also get (interval, ts) so reader range queries filtered by interval seek straight to the range.
+        The old ix_{table}_ on the index cols is a strict prefix of ux_{table}_ver and is dropped.
+        """
+        cols_sql = ", ".join(f'"{c}"' for c in idx_cols)
+        cur.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "ux_{table_name}_ver" ON "{table_name}" ({cols_sql},"version")')
+        if "interval" in idx_cols:
             cur.execute(
-                f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_" ON "{table_name}" '
-                f"({', '.join(f'"{c}"' for c in idx_cols)})"
-            )
-            cur.execute(
-                f'CREATE UNIQUE INDEX IF NOT EXISTS "ux_{table_name}_ver" '
-                f'ON "{table_name}" ({", ".join(f'"{c}"' for c in idx_cols)},"version")'
+                f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_iv_ts" ON "{table_name}" ("interval", "{idx_cols[0]}")'
             )
+        cur.execute(f'DROP INDEX IF EXISTS "ix_{table_name}_"')
+
+    def _statements(self, table_name: str, idx_cols: list[str], data_cols: list[str]) -> tuple[str, list[str], str]:
+        """Index-subset SELECT, insert column order and INSERT for a table/column layout, built once per layout."""
+        key = (table_name, tuple(idx_cols), tuple(data_cols))
+        stmts = self._stmt_cache.get(key)
+        if stmts is None:
+            where_sql = " AND ".join([f'"{c}" = ?' for c in idx_cols])
+            select_subset_sql = f'SELECT * FROM "{table_name}" WHERE {where_sql};'
+            insert_cols = idx_cols + data_cols + ["version"]
+            placeholders = ", ".join("?" for _ in insert_cols)
+            col_list = ", ".join(f'"{c}"' for c in insert_cols)
+            insert_sql = f'INSERT INTO "{table_name}" ({col_list}) VALUES ({placeholders});'
+            stmts = self._stmt_cache[key] = (select_subset_sql, insert_cols, insert_sql)
+        return stmts
+
+    def _activate(self, db_filepath: Path) -> bool:
+        """Make the pooled connection for db_filepath the active one; False if it is not open."""
+        entry = self._pool.get(db_filepath)
+        if entry is None:
+            return False
+        self._pool.move_to_end(db_filepath)
+        self._conn, self._cursor = entry
+        self._open_db = db_filepath
+        return True
 
     def _ensure_open(
         self, db_filepath: Path, table_name: str, mode: str, idx_cols: list[str], provider: str, exchange: str
     ) -> None:
         """Open DB; create/verify meta, stats, and the table with the requested mode."""
         target = (db_filepath, table_name)
-        need_open = (self._open_db != db_filepath) or (self._conn is None) or (self._cursor is None)
-        if need_open:
+        if not self._activate(db_filepath):
             logger.info("Opening DB %s; table=%s; mode=%s; idx_cols=%s", db_filepath, table_name, mode, idx_cols)
 
-            self.close()
+            while len(self._pool) >= self.max_open_dbs:
+                _, (old_conn, old_cur) = self._pool.popitem(last=False)
+                self._close_conn(old_conn, old_cur)
             db_filepath.parent.mkdir(parents=True, exist_ok=True)
             uri = f"file:{str(db_filepath)}?mode=rwc"
             conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
@@ -270,7 +443,12 @@ class SQLiteWriter:
                 conn.execute("PRAGMA journal_mode=WAL;")
             conn.execute("PRAGMA wal_autocheckpoint=1000;")
             conn.execute("PRAGMA synchronous=NORMAL;")
+            if self.perf_pragmas:
+                conn.execute("PRAGMA temp_store=MEMORY;")
+                conn.execute("PRAGMA cache_size=-65536;")
+                conn.execute("PRAGMA mmap_size=268435456;")
             cur = conn.cursor()
+            self._pool[db_filepath] = (conn, cur)
             self._conn, self._cursor, self._open_db = conn, cur, db_filepath
 
         if self._cursor is None:
@@ -285,10 +463,19 @@ class SQLiteWriter:
         cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1;", (table_name,))
         if cur.fetchone() is None:
             # DB wasn't "just opened", we're just adding a new table to an existing DB
-            self._verify_or_create_tables(
-                cur, table_name, idx_cols, provider, exchange, db_just_opened=False, mode=mode
-            )
-            self._conn.commit()
+            # All DDL in one write transaction: one journal sync instead of one per autocommitted CREATE, and a
+            # concurrent opener waits on the lock, then sees the tables via the existence checks inside
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._verify_or_create_tables(
+                    cur, table_name, idx_cols, provider, exchange, db_just_opened=False, mode=mode
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self._indexed.add(target)  # created with current indexes (here or by the opener we waited on)
 
         # Verify table shape & cache for index columns
         cur.execute(f'PRAGMA table_info("{table_name}")')
@@ -300,6 +487,10 @@ class SQLiteWriter:
                 f"missing required columns {sorted(required - existing_cols)}."
             )
 
+        # Bring indexes of tables created by older versions up to date, once per table for this writer
+        if target not in self._indexed and self._upgrade_indexes(self._conn, cur, table_name, idx_cols):
+            self._indexed.add(target)
+
         self._open_for = target
         self._table_meta[target] = {"mode": mode, "cols": existing_cols}
 
@@ -342,6 +533,33 @@ class SQLiteWriter:
                             'Column "%s" declared as %s but inferred %s (leaving as-is).', c, declared, inferred
                         )
 
+    def _update_table_stats(
+        self,
+        cur: sqlite3.Cursor,
+        table_name: str,
+        n_rows: int,
+        batch_min_ts: float | None,
+        batch_max_ts: float | None,
+        batch_min_date: str | None,
+        batch_max_date: str | None,
+    ) -> None:
+        """__table_stats__: apply O(1) updates once per batch (inside the caller's transaction)."""
+        cur.execute(
+            _TABLE_STATS_UPSERT_SQL, (table_name, n_rows, batch_min_ts, batch_max_ts, batch_min_date, batch_max_date)
+        )
+
+    def _update_interval_stats(
+        self, cur: sqlite3.Cursor, table_name: str, interval_tally: dict[str, dict[str, Any]]
+    ) -> None:
+        """__interval_stats__: apply O(1) updates once per batch (inside the caller's transaction)."""
+        cur.executemany(
+            _INTERVAL_STATS_UPSERT_SQL,
+            [
+                (table_name, iv, s["count"], s["min_ts"], s["max_ts"], s["min_date"], s["max_date"])
+                for iv, s in interval_tally.items()
+            ],
+        )
+
     def insert_many(
         self,
         db_filepath: Path,
@@ -387,27 +605,33 @@ class SQLiteWriter:
         # Evolve data columns (non-index, non-version, non-msg_id) with type inference from sample values
         affinity_cols = set().union(*(p["row"].keys() for _, p in batch))
 
-        first_non_null: dict[str, Any] = dict.fromkeys(affinity_cols)
+        # One sample value per (column, Python type) across the whole batch, so affinity reflects every row
+        samples: dict[str, dict[type, Any]] = {}
         for _, dict_p in batch:
-            p = dict_p["row"]
-            for c in affinity_cols:
-                if first_non_null[c] is None:
-                    v = p.get(c)
-                    if v is not None:
-                        first_non_null[c] = v
+            for c, v in dict_p["row"].items():
+                if v is not None:
+                    by_type = samples.get(c)
+                    if by_type is None:
+                        samples[c] = {type(v): v}
+                    elif type(v) not in by_type:
+                        by_type[type(v)] = v
 
         # Decide the target declared type per column (affinity)
         # None -> declare with no type (affinity NONE)
         self.target_affinity: dict[str, str | None] = {}
-        for c in affinity_cols:
-            v = first_non_null[c]
-            if v is not None:
-                self.target_affinity[c] = self.infer_sqlite_affinity(v)
+        for c, by_type in samples.items():
+            affs = [self.infer_sqlite_affinity(v) for v in by_type.values()]
+            if len(set(affs)) == 1:
+                self.target_affinity[c] = affs[0]
+            elif set(affs) == {"INTEGER", "REAL"}:
+                self.target_affinity[c] = "REAL"  # e.g. prices that happen to be integral in some rows
+            else:
+                self.target_affinity[c] = affs[0]
         payload_cols = affinity_cols - (set(idx_cols) | {"version"})  # All non None
 
         # Skip and ack if all payload values are None, or contain only index cols
         ok_ids: list[str] = []
-        if not payload_cols or all(first_non_null.get(c) is None for c in payload_cols):
+        if not payload_cols or all(c not in samples for c in payload_cols):
             ok_ids = [mid for mid, _ in batch]
             logger.debug(
                 "Index-only batch for %s/%s (mode=%s); acking %d message(s) without DB I/O",
@@ -418,33 +642,48 @@ class SQLiteWriter:
             )
             return ok_ids
 
-        # Open / verify schema for this mode
-        self._ensure_open(db_filepath, table_name, mode, idx_cols, provider, exchange)
-        if self._cursor is None or self._conn is None:
-            raise RuntimeError("Failed to initialize cursor, conn, or target")
-        conn, cur = self._conn, self._cursor
+        # Skip schema verification/migration/evolution when this table already satisfies the batch's signature
+        target = (db_filepath, table_name)
+        schema_sig = (mode, frozenset(self.target_affinity.items()), frozenset(payload_cols))
+        cached = self._schema_cache.get(target)
+        if cached is not None and cached[0] == schema_sig and self._activate(db_filepath):
+            table_cols, declared = cached[1], cached[2]
+            self._open_for = target
+            if self._cursor is None or self._conn is None:
+                raise RuntimeError("Failed to initialize cursor, conn, or target")
+            conn, cur = self._conn, self._cursor
+        else:
+            # Open / verify schema for this mode
+            self._ensure_open(db_filepath, table_name, mode, idx_cols, provider, exchange)
+            if self._cursor is None or self._conn is None:
+                raise RuntimeError("Failed to initialize cursor, conn, or target")
+            conn, cur = self._conn, self._cursor
 
-        # If existing table contains col with no type, but current batch can be used to type col...
-        # Opportunistic migration for already-existing weak declarations
-        # Note: this works because previously untyped cols are unlikely to be large tables
-        self._migrate_table_schema(conn, cur, table_name, mode=mode, idx_cols=idx_cols)
+            # If existing table contains col with no type, but current batch can be used to type col...
+            # Opportunistic migration for already-existing weak declarations
+            # Note: this works because previously untyped cols are unlikely to be large tables
+            self._migrate_table_schema(conn, cur, table_name, mode=mode, idx_cols=idx_cols)
 
-        # Then evolve columns for any *new* columns (those not yet present)
-        self._evolve_columns(cur, table_name, payload_cols)
+            # Then evolve columns for any *new* columns (those not yet present)
+            self._evolve_columns(cur, table_name, payload_cols)
 
-        # Prepare SELECT for index subset
-        where_sql = " AND ".join([f'"{c}" = ?' for c in idx_cols])
-        select_subset_sql = f'SELECT * FROM "{table_name}" WHERE {where_sql};'
+            cur.execute(f'PRAGMA table_info("{table_name}")')
+            info = cur.fetchall()
+            table_cols = [row["name"] for row in info]
+
+            # Cache only once declarations match the targets (a migration skipped on a busy DB is retried next batch)
+            declared = {row["name"]: (row["type"] or "").upper() for row in info}
+            protected = set(idx_cols) | {"version"}
+            if all(
+                _affinity_satisfies(declared.get(c, ""), a)
+                for c, a in self.target_affinity.items()
+                if c not in protected
+            ):
+                self._schema_cache[target] = (schema_sig, table_cols, declared)
 
         # Prepare insert columns (index + payload_cols∩table + version)
-        cur.execute(f'PRAGMA table_info("{table_name}")')
-        table_cols = [row["name"] for row in cur.fetchall()]
         non_index_payload_cols = [c for c in table_cols if c in payload_cols]
-        insert_cols = idx_cols + non_index_payload_cols + ["version"]
-        placeholders = ", ".join("?" for _ in insert_cols)
-        insert_sql = (
-            f'INSERT INTO "{table_name}" ({", ".join(f"""\"{c}\"""" for c in insert_cols)}) VALUES ({placeholders});'
-        )
+        select_subset_sql, insert_cols, insert_sql = self._statements(table_name, idx_cols, non_index_payload_cols)
 
         # Stats accumulation
         batch_min_ts = None  # seconds
@@ -452,77 +691,109 @@ class SQLiteWriter:
         batch_min_date = None
         batch_max_date = None
 
+        # Columns bound per row ahead of version, and their declared types (for the stored-form conversion)
+        value_cols = insert_cols[:-1]
+        n_idx = len(idx_cols)
+
+        # Known rows per index (DB subset + rows inserted earlier in this batch) and their max version
+        idx_state: dict[tuple[Any, ...], tuple[list[dict[str, Any]], int]] = {}
+        sentinel = object()
+
+        def known_rows_for(idx_vals: tuple[Any, ...]) -> tuple[list[dict[str, Any]], int]:
+            state = idx_state.get(idx_vals)
+            if state is None:  # Subset by index, queried once per index per batch
+                cur.execute(select_subset_sql, idx_vals)
+                subset_rows = [dict(r) for r in cur.fetchall()]
+                logger.debug("subset_rows=%d for idx=%s", len(subset_rows), idx_vals)
+                max_version = max((int(r["version"]) for r in subset_rows if r["version"] is not None), default=0)
+                state = idx_state[idx_vals] = (subset_rows, max_version)
+            return state
+
+        def plan_row(payload: dict[str, Any], vals: tuple[Any, ...]) -> list[Any] | None:
+            """Insert values (with the next version) for a candidate row, or None if it duplicates a known row."""
+            known_rows, max_version = known_rows_for(vals[:n_idx])
+            # Exact duplicate: every payload key matches, comparing column values in their stored form
+            p_items = {**payload, **{c: v for c, v in zip(value_cols, vals, strict=True) if c in payload}}.items()
+            if any(all(rd.get(k, sentinel) == v for k, v in p_items) for rd in known_rows):
+                logger.debug("Exact duplicate detected; ack only. idx=%s", vals[:n_idx])
+                return None
+            version = max_version + 1
+            if version > 1:
+                logger.debug("Insert with version=%d idx=%s", version, vals[:n_idx])
+            return [*vals, version]
+
+        def record_row(row_vals: list[Any]) -> None:
+            """Make an inserted row visible to dedup/versioning of the rest of the batch."""
+            known_rows, _ = idx_state[tuple(row_vals[:n_idx])]
+            known_rows.append(dict(zip(insert_cols, row_vals, strict=True)))
+            idx_state[tuple(row_vals[:n_idx])] = (known_rows, row_vals[-1])
+
         conn.execute("BEGIN IMMEDIATE")
         try:
+            candidates: list[tuple[dict[str, Any], tuple[Any, ...]]] = []
             for tup_in in batch:
                 msg_id = tup_in[0]
                 if not isinstance(msg_id, str) or not msg_id.strip():
                     raise ValueError("Each payload must include a non-empty 'msg_id' string.")
 
                 payload = tup_in[1]["row"]
+                # Every message is acked: duplicates and rows the DB rejects are dropped, not redelivered
+                ok_ids.append(msg_id)
 
                 # Test and reject empy payload
                 is_blank_data = all(payload.get(k) is None for k in payload_cols)
                 if is_blank_data:
-                    ok_ids.append(msg_id)
                     continue
 
                 # Build & validate index values (must be present and not None)
                 for c in idx_cols:
                     if c not in payload or payload[c] is None:
                         raise ValueError(f"Missing required index column '{c}' (mode={mode})")
-                idx_vals = tuple(payload[c] for c in idx_cols)
-
-                ### Check for dupes
-                # Subset by index
-                cur.execute(select_subset_sql, idx_vals)
-                subset_rows = cur.fetchall()
-                logger.debug("subset_rows=%d for idx=%s", len(subset_rows), idx_vals)
-
-                version = 1
-                if subset_rows:
-                    sentinel = object()
-                    p_items = tuple(payload.items())
-                    is_exact_dup = False
-                    for r in subset_rows:
-                        rd = dict(r)  # convert Row to plain dict to use .get()
-                        # Test if payload has all keys and all match (exact duplicate)
-                        if all(rd.get(k, sentinel) == v for k, v in p_items):
-                            is_exact_dup = True
-                            break
-
-                    if is_exact_dup:
-                        ok_ids.append(msg_id)
-                        logger.debug("Exact duplicate detected; ack only. idx=%s", idx_vals)
-                        continue
-
-                    ### Set new version number
-                    cur.execute(  # Subset row with max version number
-                        f'SELECT * FROM "{table_name}" WHERE {where_sql} ORDER BY "version" DESC NULLS LAST LIMIT 1;',
-                        idx_vals,
-                    )
-                    row_max = cur.fetchone()
-                    max_version = int(row_max["version"]) if row_max and row_max["version"] is not None else 0
-                    version = max_version + 1
-
-                # Assemble values for insert
-                row_vals: list[Any] = []
-                row_vals.extend(payload.get(c) for c in idx_cols)  # index
-                row_vals.extend(payload.get(c) for c in non_index_payload_cols)  # data
-                row_vals.append(int(version))  # version
-                if version > 1:
-                    logger.debug("Insert with version=%d idx=%s", version, idx_vals)
-
+                candidates.append((payload, tuple(payload.get(c) for c in value_cols)))
+
+            # Compare and insert values as SQLite will store them (column affinity applied), so e.g. a number sent
+            # for a TEXT column matches the text already stored instead of becoming a new version
+            stored = self._stored_forms(cur, [declared.get(c, "") for c in value_cols], [v for _, v in candidates])
+
+            staged_vals: list[list[Any]] = []
+            staged_payloads: list[dict[str, Any]] = []
+            for (payload, _), vals in zip(candidates, stored, strict=True):
+                row_vals = plan_row(payload, vals)
+                if row_vals is not None:
+                    record_row(row_vals)
+                    staged_vals.append(row_vals)
+                    staged_payloads.append(payload)
+
+            # One prepared statement reused for the whole batch; if any row is rejected, replay the batch row by
+            # row (skipping failures, as before), versioning and deduplicating only against rows that did land.
+            inserted = staged_payloads
+            if staged_vals:
+                cur.execute('SAVEPOINT "bulk_insert"')
                 try:
-                    cur.execute(insert_sql, row_vals)
-                except Exception:
-                    logger.exception(
-                        "Row insert failed for %s/%s idx=%s; skipping row", db_filepath, table_name, idx_vals
-                    )
-                    ok_ids.append(msg_id)
-                    continue
-                ok_ids.append(msg_id)
-
+                    cur.executemany(insert_sql, staged_vals)
+                except sqlite3.Error:
+                    cur.execute('ROLLBACK TO "bulk_insert"')
+                    idx_state.clear()
+                    inserted = []
+                    for (payload, _), vals in zip(candidates, stored, strict=True):
+                        replanned = plan_row(payload, vals)
+                        if replanned is None:
+                            continue
+                        try:
+                            cur.execute(insert_sql, replanned)
+                        except Exception:
+                            logger.exception(
+                                "Row insert failed for %s/%s idx=%s; skipping row",
+                                db_filepath,
+                                table_name,
+                                tuple(payload.get(c) for c in idx_cols),
+                            )
+                            continue
+                        record_row(replanned)
+                        inserted.append(payload)
+                cur.execute('RELEASE "bulk_insert"')
+
+            for payload in inserted:
                 # Update tally for row interval stats
                 if track_intervals:
                     iv = payload.get("interval")
@@ -550,155 +821,76 @@ class SQLiteWriter:
                     d = validate_isodatestr(v)
                     batch_min_date, batch_max_date = self.update_min_max(d, batch_min_date, batch_max_date)
 
+            # Stats ride in the same transaction as the rows: one commit (and one WAL sync) per batch
+            if ok_ids:
+                self._update_table_stats(
+                    cur, table_name, len(ok_ids), batch_min_ts, batch_max_ts, batch_min_date, batch_max_date
+                )
+            if track_intervals and interval_tally:
+                self._update_interval_stats(cur, table_name, interval_tally)
+
             conn.commit()
         except Exception as e:
             logger.exception("There was an exception on the batch.  Nothing was written -> rollback: %s", e)
             conn.rollback()
             raise
 
-        # __table_stats__: apply O(1) updates once per batch
-        try:
-            if ok_ids:
-                cur.execute('INSERT OR IGNORE INTO "__table_stats__"(table_name) VALUES (?)', (table_name,))
-                cur.execute(
-                    'UPDATE "__table_stats__" SET row_count = row_count + ?, updated_utc = CURRENT_TIMESTAMP '
-                    "WHERE table_name = ?",
-                    (len(ok_ids), table_name),
-                )
-                if batch_min_ts is not None:
-                    cur.execute(
-                        'UPDATE "__table_stats__" SET '
-                        "min_timestamp_utc_s = COALESCE(min(min_timestamp_utc_s, ?), ?), "
-                        "updated_utc = CURRENT_TIMESTAMP WHERE table_name = ?",
-                        (batch_min_ts, batch_min_ts, table_name),
-                    )
-                if batch_max_ts is not None:
-                    cur.execute(
-                        'UPDATE "__table_stats__" SET '
-                        "max_timestamp_utc_s = COALESCE(max(max_timestamp_utc_s, ?), ?), "
-                        "updated_utc = CURRENT_TIMESTAMP WHERE table_name = ?",
-                        (batch_max_ts, batch_max_ts, table_name),
-                    )
-                if batch_min_date is not None:
-                    cur.execute(
-                        'UPDATE "__table_stats__" SET '
-                        "min_date = CASE WHEN min_date IS NULL OR ? < min_date THEN ? ELSE min_date END, "
-                        "updated_utc = CURRENT_TIMESTAMP WHERE table_name = ?",
-                        (batch_min_date, batch_min_date, table_name),
-                    )
-                if batch_max_date is not None:
-                    cur.execute(
-                        'UPDATE "__table_stats__" SET '
-                        "max_date = CASE WHEN max_date IS NULL OR ? > max_date THEN ? ELSE max_date END, "
-                        "updated_utc = CURRENT_TIMESTAMP WHERE table_name = ?",
-                        (batch_max_date, batch_max_date, table_name),
-                    )
-                conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
+        return ok_ids
 
-        # __interval_stats__: apply O(1) updates once per batch
+    @staticmethod
+    def _close_conn(conn: sqlite3.Connection, cur: sqlite3.Cursor) -> None:
         try:
-            if track_intervals and interval_tally:
-                conn.execute("BEGIN IMMEDIATE")
-                for iv, s in interval_tally.items():
-                    # Ensure row exists
-                    cur.execute(
-                        'INSERT OR IGNORE INTO "__interval_stats__"(table_name, interval) VALUES (?, ?)',
-                        (table_name, iv),
-                    )
-
-                    # Increment count
-                    if s["count"] > 0:
-                        cur.execute(
-                            'UPDATE "__interval_stats__" SET '
-                            "row_count = row_count + ?, "
-                            "updated_utc = CURRENT_TIMESTAMP "
-                            "WHERE table_name = ? AND interval = ?",
-                            (s["count"], table_name, iv),
-                        )
-
-                    # Merge numeric timestamp bounds (intraday)
-                    if s["min_ts"] is not None:
-                        cur.execute(
-                            'UPDATE "__interval_stats__" SET '
-                            "min_timestamp_utc_s = CASE "
-                            "  WHEN min_timestamp_utc_s IS NULL OR ? < min_timestamp_utc_s THEN ? "
-                            "  ELSE min_timestamp_utc_s END, "
-                            "updated_utc = CURRENT_TIMESTAMP "
-                            "WHERE table_name = ? AND interval = ?",
-                            (s["min_ts"], s["min_ts"], table_name, iv),
-                        )
-                    if s["max_ts"] is not None:
-                        cur.execute(
-                            'UPDATE "__interval_stats__" SET '
-                            "max_timestamp_utc_s = CASE "
-                            "  WHEN max_timestamp_utc_s IS NULL OR ? > max_timestamp_utc_s THEN ? "
-                            "  ELSE max_timestamp_utc_s END, "
-                            "updated_utc = CURRENT_TIMESTAMP "
-                            "WHERE table_name = ? AND interval = ?",
-                            (s["max_ts"], s["max_ts"], table_name, iv),
-                        )
-
-                    # Merge date bounds (interday)
-                    if s["min_date"] is not None:
-                        cur.execute(
-                            'UPDATE "__interval_stats__" SET '
-                            "min_date = CASE "
-                            "  WHEN min_date IS NULL OR ? < min_date THEN ? "
-                            "  ELSE min_date END, "
-                            "updated_utc = CURRENT_TIMESTAMP "
-                            "WHERE table_name = ? AND interval = ?",
-                            (s["min_date"], s["min_date"], table_name, iv),
-                        )
-                    if s["max_date"] is not None:
-                        cur.execute(
-                            'UPDATE "__interval_stats__" SET '
-                            "max_date = CASE "
-                            "  WHEN max_date IS NULL OR ? > max_date THEN ? "
-                            "  ELSE max_date END, "
-                            "updated_utc = CURRENT_TIMESTAMP "
-                            "WHERE table_name = ? AND interval = ?",
-                            (s["max_date"], s["max_date"], table_name, iv),
-                        )
-
+            # If not autocommit, ensure all writes are flushed
+            try:
                 conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-
-        return ok_ids
+            except Exception:
+                pass
+        finally:
+            # Close cursor/connection unconditionally
+            try:
+                cur.close()
+            except Exception:
+                pass
+            try:
+                conn.close()
+            except Exception:
+                pass
 
     def close(self) -> None:
-        """
-        Close cursor/connection. If `clean` and this was opened for writing,
-        attempt to checkpoint WAL and switch to DELETE to remove -wal/-shm.
-        """
+        """Flush and close every pooled cursor/connection."""
         try:
-            if self._conn is not None:
-                # If not autocommit, ensure all writes are flushed
-                try:
-                    self._conn.commit()
-                except Exception:
-                    pass
+            while self._pool:
+                _, (conn, cur) = self._pool.popitem(last=False)
+                self._close_conn(conn, cur)
         finally:
-            # Close cursor/connection unconditionally
-            if self._cursor is not None:
-                try:
-                    self._cursor.close()
-                except Exception:
-                    pass
-            if self._conn is not None:
-                try:
-                    self._conn.close()
-                except Exception:
-                    pass
             self._cursor = None
             self._conn = None
+            self._open_db = None
             self._open_for = None
 
 
+class _RowView(Mapping[str, Any]):
+    """Read-only mapping over a raw result tuple; every row of a query shares one column->position index."""
+
+    __slots__ = ("_vals", "_idx")
+
+    def __init__(self, vals: tuple[Any, ...], idx: dict[str, int]):
+        self._vals = vals
+        self._idx = idx
+
+    def __getitem__(self, key: str) -> Any:
+        return self._vals[self._idx[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._idx)
+
+    def __len__(self) -> int:
+        return len(self._idx)
+
+    def __repr__(self) -> str:
+        return repr(dict(zip(self._idx, self._vals, strict=True)))
+
+
 class SQLiteReader:
     def __init__(self, ts_col: str, busy_timeout_ms: int = 5000):
         self.ts_col = ts_col
@@ -708,55 +900,67 @@ class SQLiteReader:
 
     def read_dt_range(
         self, db_files: list[Path], table: str, interval: str | None, start: str | int, end: str | int
-    ) -> list[dict]:
+    ) -> list[Mapping[str, Any]]:
         """
         Return all 1m rows for table between [start, end] (inclusive) across the given files.
-        Skips missing/empty files gracefully. Returns a single list of dicts sorted by datetime.
+        Skips missing/empty files gracefully. Returns a single list of read-only row mappings sorted by datetime.
         """
-        rows = []
-        out: list[dict] = []
-        for db in db_files:
-            if not Path(db).exists():
-                continue
-
-            try:
-                self._connect_ro(db)
-
-                if self._conn is None:
-                    raise
-
-                if not self._table_exists(table):
-                    continue
+        out = list(self.iter_dt_range(db_files, table, interval, start, end))
+        # Each file is already ordered; this only reorders if files overlap (near-linear on sorted input)
+        out.sort(key=lambda r: r[self.ts_col])
+        return out
 
-                if not self._has_any_in_range(table, interval, start, end):
+    def iter_dt_range(
+        self,
+        db_files: list[Path],
+        table: str,
+        interval: str | None,
+        start: str | int,
+        end: str | int,
+        chunk: int = READ_CHUNK_ROWS,
+    ) -> Iterator[Mapping[str, Any]]:
+        """
+        Yield rows for table between [start, end] (inclusive) file by file, ordered by ts within each file.
+        Rows are fetched `chunk` at a time, so memory stays flat regardless of the range size.
+        """
+        try:
+            for db in db_files:
+                if not Path(db).exists():
                     continue
 
-                rows = self._query_range(table, interval, start, end) or []
-                out.extend(rows)
+                try:
+                    self._connect_ro(db)
 
-            except sqlite3.Error as e:
-                logger.warning("SQLite error reading %s: %s", db, e)
-                continue
+                    if self._conn is None:
+                        raise
 
-        self.close()
+                    if not self._table_exists(table):
+                        continue
 
-        if not rows:
-            return []
+                    yield from self._iter_range(table, interval, start, end, chunk)
 
-        out.sort(key=lambda r: r[self.ts_col])
-        return out
+                except sqlite3.Error as e:
+                    logger.warning("SQLite error reading %s: %s", db, e)
+                    continue
+        finally:
+            self.close()
 
     def _connect_ro(self, db_path: Path):
         """
         Open read-only with WAL-friendly pragmas.
         Using URI with mode=ro ensures we don’t interfere with the writer.
         """
+        # Release the previous file's connection before moving on to the next one
+        self.close()
         # read-only, don’t attempt to write WAL files
         uri = f"file:{str(db_path)}?mode=ro"
         conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
         conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms};")
         conn.execute("PRAGMA query_only=ON;")
+        # journal_mode/synchronous belong to the writer; these only shape this connection's reads
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        conn.execute("PRAGMA cache_size=-65536;")
+        conn.execute("PRAGMA mmap_size=268435456;")
         self._conn = conn
 
     def _table_exists(self, table: str) -> bool:
@@ -765,33 +969,28 @@ class SQLiteReader:
             cur = self._conn.execute(q, (table,))
         return cur.fetchone() is not None
 
-    def _has_any_in_range(self, table: str, interval: str | None, start: str | int, end: str | int) -> bool:
-        if interval and self._col_exists(table, "interval"):
-            q = f'SELECT 1 FROM "{table}" WHERE {self.ts_col} BETWEEN ? AND ? AND interval=? LIMIT 1;'
-            if self._conn is not None:
-                cur = self._conn.execute(q, (start, end, interval))
-        else:
-            q = f'SELECT 1 FROM "{table}" WHERE {self.ts_col} BETWEEN ? AND ? LIMIT 1;'
-            if self._conn is not None:
-                cur = self._conn.execute(q, (start, end))
-        return cur.fetchone() is not None
-
-    def _query_range(self, table: str, interval: str | None, start: str | int, end: str | int) -> list[dict]:
+    def _iter_range(
+        self, table: str, interval: str | None, start: str | int, end: str | int, chunk: int
+    ) -> Iterator[Mapping[str, Any]]:
         if interval and self._col_exists(table, "interval"):
-            q = f'SELECT * FROM "{table}" WHERE {self.ts_col} BETWEEN ? AND ? AND interval=?;'
+            q = f'SELECT * FROM "{table}" WHERE {self.ts_col} BETWEEN ? AND ? AND interval=? ORDER BY {self.ts_col};'
             if self._conn is not None:
                 cur = self._conn.execute(q, (start, end, interval))
         else:
-            q = f'SELECT * FROM "{table}" WHERE {self.ts_col} BETWEEN ? AND ?;'
+            q = f'SELECT * FROM "{table}" WHERE {self.ts_col} BETWEEN ? AND ? ORDER BY {self.ts_col};'
             if self._conn is not None:
                 cur = self._conn.execute(q, (start, end))
-        return [dict(row) for row in cur.fetchall()]
+        idx = {d[0]: i for i, d in enumerate(cur.description)}
+        while rows := cur.fetchmany(chunk):
+            for row in rows:
+                yield _RowView(row, idx)
 
     def _col_exists(self, table: str, col: str) -> bool:
         q = f'PRAGMA table_info("{table}");'
         if self._conn is not None:
-            cols = {r["name"] for r in self._conn.execute(q)}
-        return col in cols
+            # rows are (cid, name, type, notnull, dflt_value, pk); stop at the first match
+            return any(r[1] == col for r in self._conn.execute(q))
+        return False
 
     def close(self) -> None:
         """
@@ -4,6 +4,8 @@ import json
 import logging
 import os
 import time
+from collections.abc import Mapping, Sequence
+from pathlib import Path
 from typing import Any, Protocol, cast, runtime_checkable
 
 logger = logging.getLogger(__name__)
@@ -12,6 +14,8 @@ logger = logging.getLogger(__name__)
 @runtime_checkable
 class _BaseStream(Protocol):
     def emit(self, payload: dict[str, Any]) -> str: ...
+    def emit_many(self, payloads: list[dict[str, Any]]) -> list[str]: ...
+    def emit_json_many(self, docs: list[str]) -> list[str]: ...
     def ensure_group(self, group: str) -> None: ...
     def read_group(self, group: str, consumer: str, count: int, block_ms: int) -> list[tuple[str, dict[str, Any]]]: ...
     def ack(self, group: str, ids: list[str]) -> int: ...
@@ -19,21 +23,28 @@ class _BaseStream(Protocol):
     def trim_maxlen(self, maxlen: int) -> None: ...
 
 
-class RedisStream(_BaseStream):
-    """
-    Real Redis (docker). Uses streams so writer can XREADGROUP and ack.
-    REDIS_URL like: redis://redis:6379/1
-    """
-
-    def __init__(self, stream: str, redis_url: str):
-        import redis
+class _RedisStreamOps(_BaseStream):
+    """Stream operations shared by RedisStream and FakeRedisStream; subclasses only set `stream` and `r`."""
 
-        self.stream = stream
-        self.r = redis.from_url(redis_url, decode_responses=True)
+    stream: str
+    r: Any
 
     def emit(self, payload: dict[str, Any]) -> str:
         return cast(str, self.r.xadd(self.stream, {"json": json.dumps(payload, separators=(",", ":"))}))
 
+    def emit_many(self, payloads: list[dict[str, Any]]) -> list[str]:
+        """Pipeline XADDs so a whole batch costs one round trip instead of one per row."""
+        return self.emit_json_many([json.dumps(payload, separators=(",", ":")) for payload in payloads])
+
+    def emit_json_many(self, docs: list[str]) -> list[str]:
+        """emit_many() for payloads the producer has already serialized."""
+        if not docs:
+            return []
+        pipe = self.r.pipeline(transaction=False)
+        for doc in docs:
+            pipe.xadd(self.stream, {"json": doc})
+        return cast(list[str], pipe.execute())
+
     def ensure_group(self, group: str) -> None:
         try:
             self.r.xgroup_create(self.stream, group, id="0-0", mkstream=True)
@@ -98,7 +109,20 @@ class RedisStream(_BaseStream):
         self.r.xtrim(self.stream, maxlen=maxlen, approximate=True)
 
 
-class FakeRedisStream(_BaseStream):
+class RedisStream(_RedisStreamOps):
+    """
+    Real Redis (docker). Uses streams so writer can XREADGROUP and ack.
+    REDIS_URL like: redis://redis:6379/1
+    """
+
+    def __init__(self, stream: str, redis_url: str):
+        import redis
+
+        self.stream = stream
+        self.r = redis.from_url(redis_url, decode_responses=True)
+
+
+class FakeRedisStream(_RedisStreamOps):
     """
     Local (single process) using fakeredis—same API as RedisStream.
     Useful when you want to run everything in one Python process.
@@ -110,67 +134,6 @@ class FakeRedisStream(_BaseStream):
         self.stream = stream
         self.r = fakeredis.FakeRedis(server=server, decode_responses=True)
 
-    def emit(self, payload: dict[str, Any]) -> str:
-        return cast(str, self.r.xadd(self.stream, {"json": json.dumps(payload, separators=(",", ":"))}))
-
-    def ensure_group(self, group: str) -> None:
-        try:
-            self.r.xgroup_create(self.stream, group, id="0-0", mkstream=True)
-        except Exception as e:
-            if "BUSYGROUP" not in str(e):
-                raise
-
-    def read_group(self, group: str, consumer: str, count: int, block_ms: int) -> list[tuple[str, dict[str, Any]]]:
-        """
-        Try to accumulate up to `count` messages without exceeding `block_ms` total wall time.
-        Returns as soon as we hit `count` OR the deadline passes.
-        """
-        deadline = time.monotonic() + (block_ms / 1000.0)
-        out: list[tuple[str, dict[str, Any]]] = []
-        first = True
-        TOPUP_MS = 25  # small coalescing window per top-up read
-
-        while len(out) < count:
-            remaining_ms = max(0, int((deadline - time.monotonic()) * 1000))
-            if remaining_ms == 0 and not first:
-                break
-
-            per_call_block = remaining_ms if first else min(remaining_ms, TOPUP_MS)
-            want = count - len(out)
-
-            resp = cast(
-                list[tuple[str, list[tuple[str, dict[str, Any]]]]],
-                self.r.xreadgroup(
-                    groupname=group,
-                    consumername=consumer,
-                    streams={self.stream: ">"},
-                    count=want,
-                    block=per_call_block if per_call_block > 0 else 0,
-                ),
-            )
-            if not resp:
-                # nothing arrived during this (top-up) window; loop until deadline
-                first = False
-                continue
-
-            _, entries = resp[0]
-            for msg_id, kv in entries:
-                s = kv["json"]
-                out.append((msg_id, json.loads(s)))
-
-            first = False
-
-        return out
-
-    def ack(self, group: str, ids: list[str]) -> int:
-        return cast(int, self.r.xack(self.stream, group, *ids) if ids else 0)
-
-    def delete(self, ids: list[str]) -> int:
-        return cast(int, self.r.xdel(self.stream, *ids) if ids else 0)
-
-    def trim_maxlen(self, maxlen: int) -> None:
-        self.r.xtrim(self.stream, maxlen=maxlen, approximate=True)
-
 
 # ---------- Binding from writer ----------
 _STREAM_SINGLETON: _BaseStream | None = None
@@ -215,7 +178,7 @@ def _get_stream_for_emit() -> _BaseStream:
 
 
 # # --------- Producer-facing, single-call API ---------
-# # Producers call ONLY this function:
+# # Producers call ONLY these functions:
 def emit(payload: dict[str, Any]) -> str:
     try:  # Converting rcvd pathobject to str for json serializing, reconvd b4 .db writing
         path_obj = payload["db_path"]
@@ -224,3 +187,28 @@ def emit(payload: dict[str, Any]) -> str:
         return stream.emit(payload)
     except Exception as e:
         raise e
+
+
+def emit_many(payloads: list[dict[str, Any]]) -> list[str]:
+    """
+    Batched counterpart of emit(): producers that already hold many rows (e.g. one
+    historical response) push them in a single pipelined round trip.
+    """
+    for payload in payloads:
+        payload["db_path"] = str(payload["db_path"])
+    stream = _get_stream_for_emit()
+    return stream.emit_many(payloads)
+
+
+def emit_rows(runs: Sequence[tuple[str | Path, str, Sequence[Mapping[str, Any]]]]) -> list[str]:
+    """
+    emit_many() for producers that hold rows grouped by destination as (db_path, table, rows) runs: the
+    db_path/table envelope is serialized once per run and spliced around each row's JSON, so no per-row
+    payload dict is built. Messages are identical to emit_many()'s.
+    """
+    docs: list[str] = []
+    for db_path, table, rows in runs:
+        prefix = f'{{"db_path":{json.dumps(str(db_path))},"table":{json.dumps(table)},"row":'
+        docs.extend([f"{prefix}{json.dumps(row, separators=(',', ':'))}}}" for row in rows])
+    stream = _get_stream_for_emit()
+    return stream.emit_json_many(docs)
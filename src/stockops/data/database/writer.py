@@ -7,6 +7,7 @@ import threading
 import time
 from collections import defaultdict
 from collections.abc import ItemsView
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -155,7 +156,16 @@ def _group_by_file_table(
     for mid, payload in msgs:
         groups[(payload["db_path"], payload["table"])].append((mid, payload))
 
-    return groups.items()
+    # Visit groups file by file so each db's connection and tables are handled back-to-back
+    return dict(sorted(groups.items())).items()
+
+
+@lru_cache(maxsize=256)
+def _db_target(db_path_str: str) -> tuple[Path, str, str, str]:
+    """(Path, provider, exchange, data_type) for a db_path string; a handful of files recur across batches."""
+    db_path = Path(db_path_str)
+    parsed_dict = parse_db_filename(db_path.name)
+    return db_path, parsed_dict["provider"], parsed_dict["exchange"], parsed_dict["data_type"]
 
 
 def _batch_to_writer(writer: SQLiteWriter, msgs: list[tuple[str, dict[str, Any]]]) -> list[str]:
@@ -171,12 +181,8 @@ def _batch_to_writer(writer: SQLiteWriter, msgs: list[tuple[str, dict[str, Any]]
 
     ok_all: list[str] = []
     for (db_path_str, table), batch in grouped_msgs:
-        db_path = Path(db_path_str)
-        file_str = db_path.name
-        parsed_dict = parse_db_filename(file_str)
-        ok_ids = writer.insert_many(
-            db_path, table, batch, parsed_dict["provider"], parsed_dict["exchange"], parsed_dict["data_type"]
-        )
+        db_path, provider, exchange, data_type = _db_target(db_path_str)
+        ok_ids = writer.insert_many(db_path, table, batch, provider, exchange, data_type)
         ok_all.extend(ok_ids)
     return ok_all
 
@@ -1,7 +1,25 @@
+import asyncio
 from abc import ABC, abstractmethod
 
+# Upper bound on historical tasks in flight at once (provider rate limits and HTTP pool size)
+MAX_CONCURRENT_TASKS = 16
+
 
 class AbstractHistoricalService(ABC):
     @abstractmethod
     def start_historical_task(self, command: dict):
         pass
+
+    async def run_many(self, commands: list[dict], max_concurrency: int = MAX_CONCURRENT_TASKS) -> None:
+        """Run several historical commands concurrently, each blocking task on its own worker thread.
+
+        start_historical_task must be reentrant (no per-task instance state), so one service instance serves all
+        commands. At most `max_concurrency` tasks are in flight at once.
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(command: dict) -> None:
+            async with sem:
+                await asyncio.to_thread(self.start_historical_task, command)
+
+        await asyncio.gather(*(run_one(c) for c in commands))
@@ -1,89 +1,277 @@
+import json
 import logging
 import os
-import socket
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from functools import lru_cache
 from pathlib import Path
 from typing import cast
+from urllib.parse import urlencode
 from zoneinfo import ZoneInfo
 
 import requests
-from urllib3.util import connection as urllib3_connection
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 from stockops.config import config, eodhd_config
-from stockops.data.database.write_buffer import emit
+from stockops.data.database.write_buffer import emit_many
 from stockops.data.transform import TransformData
-from stockops.data.utils import get_db_filename_for_date, tzstr_to_utcts, validate_isodatestr
+from stockops.data.utils import (
+    get_db_file_span,
+    get_zoneinfo,
+    make_ci_validator,
+    tzstr_to_utcts,
+    validate_isodatestr,
+)
 
 from .base_historical_service import AbstractHistoricalService
 
 INTRADAY_FREQUENCIES = {"1m", "5m", "1h"}
 INTERDAY_FREQUENCIES = {"d", "w", "m"}
 
+# Rows per emitted batch; bounds the transformed rows held in memory and lets writes start before the full
+# response has been transformed.
+EMIT_CHUNK_ROWS = 5000
+
+INTRADAY_URL = "https://eodhd.com/api/intraday/{}?"
+INTERDAY_URL = "https://eodhd.com/api/eod/{}?"
+
 logger = logging.getLogger(__name__)
 
 
+def _intraday_url(ticker_exch: str, interval: str, start: str, end: str, tz: ZoneInfo, api_token: str | None) -> str:
+    start_ts = tzstr_to_utcts(start, "%Y-%m-%d %H:%M", tz)
+    end_ts = tzstr_to_utcts(end, "%Y-%m-%d %H:%M", tz)
+    return INTRADAY_URL.format(ticker_exch) + urlencode(
+        {"api_token": api_token, "interval": interval, "from": start_ts, "to": end_ts, "fmt": "json"}
+    )
+
+
+def _interday_url(ticker_exch: str, interval: str, start: str, end: str, tz: ZoneInfo, api_token: str | None) -> str:
+    return INTERDAY_URL.format(ticker_exch) + urlencode(
+        {
+            "api_token": api_token,
+            "period": interval,
+            "from": validate_isodatestr(start),
+            "to": validate_isodatestr(end),
+            "fmt": "json",
+        }
+    )
+
+
+# interval -> (data_type, url builder): one lookup per task instead of chained set-membership branches
+_DISPATCH: dict[str, tuple[str, Callable[[str, str, str, str, ZoneInfo, str | None], str]]] = {
+    **dict.fromkeys(INTRADAY_FREQUENCIES, ("intraday", _intraday_url)),
+    **dict.fromkeys(INTERDAY_FREQUENCIES, ("interday", _interday_url)),
+}
+
+# Optional faster decoders, tried in order: simdjson, orjson, then stdlib json
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# simdjson parsers reuse their internal buffers but are not thread-safe (see run_many), so keep one per thread
+_parsers = threading.local()
+
+
+def _loads(body: bytes):
+    if simdjson is not None:
+        parser = getattr(_parsers, "parser", None)
+        if parser is None:
+            parser = _parsers.parser = simdjson.Parser()
+        return parser.parse(body, recursive=True)
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+@lru_cache(maxsize=64)
+def _tz_for(exchange: str) -> ZoneInfo:
+    return get_zoneinfo(cast(str, eodhd_config.EXCHANGE_METADATA[exchange]["Timezone"]))
+
+
+@lru_cache(maxsize=128)
+def _get_transformer(data_type: str, exchange: str) -> TransformData:
+    """TransformData instances are stateless after init; share one per (data_type, exchange) across tasks."""
+    return TransformData("EODHD", f"historical_{data_type}", "to_db_writer", exchange)
+
+
+class _IPv6OnlyAdapter(HTTPAdapter):
+    """
+    Binds its connections to the IPv6 wildcard source address, so only the host's IPv6 addresses can connect
+    (IPv4 candidates fail at bind). Scoped to this adapter's pools, unlike urllib3's process-wide
+    allowed_gai_family hook, which would also force IPv6 on every other thread's requests.
+    """
+
+    def init_poolmanager(self, *args, **pool_kwargs):
+        pool_kwargs["source_address"] = ("::", 0)
+        super().init_poolmanager(*args, **pool_kwargs)
+
+
+def _build_session(adapter_cls: type[HTTPAdapter] = HTTPAdapter) -> requests.Session:
+    session = requests.Session()
+    # connect=0: connection failures surface at once so _fetch_data's IPv4 -> IPv6 fallback stays prompt
+    retries = Retry(total=3, connect=0, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = adapter_cls(pool_connections=4, pool_maxsize=32, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Process-wide HTTP session so keep-alive connections to eodhd.com are reused across tasks. Built at import:
+# run_many's worker threads share it, and a lazy first-use init would race and leak a duplicate pool.
+_SESSION = _build_session()
+_IPV6_SESSION = _build_session(_IPv6OnlyAdapter)  # _fetch_data's one-shot fallback for IPv6-only hosts
+
+
+_CI_VALIDATORS = {
+    "intraday": make_ci_validator(
+        [
+            ("timestamp_UTC_s", int),
+            ("open", float),
+            ("high", float),
+            ("low", float),
+            ("close", float),
+            ("volume", int),
+            ("interval", str),
+        ]
+    ),
+    "interday": make_ci_validator(
+        [
+            ("date", str),
+            ("open", float),
+            ("high", float),
+            ("low", float),
+            ("close", float),
+            ("adjusted_close", float),
+            ("volume", int),
+            ("interval", str),
+        ]
+    ),
+}
+
+
+def _get_body(url: str, session: requests.Session = _SESSION) -> bytes:
+    """GET url and return the (decompressed) body read straight off the socket, skipping requests' chunk re-join."""
+    with session.get(url, timeout=30, stream=True) as resp:
+        resp.raise_for_status()
+        return resp.raw.read(decode_content=True)
+
+
 class EODHDHistoricalService(AbstractHistoricalService):
+    """
+    Reentrant: no per-task state lives on the instance or in mutable module globals (the HTTP sessions are built
+    at import and the IPv6 fallback has its own session), so run_many's threads can share one instance.
+    """
+
     def __init__(self):
         pass
 
-    def write_data(self, data_type: str, table_name: str, exchange: str, transformed_row: dict, test_mode: str):
-        transformer_data_type = f"historical_{data_type}"
+    def _db_span_for_row(
+        self,
+        data_type: str,
+        exchange: str,
+        tz: ZoneInfo,
+        transformed_row: dict,
+        span: tuple[Path, float, float] | None,
+    ) -> tuple[Path, float, float]:
+        """(db_path, start, end) for a row's destination file; `span` is reused while the row falls inside it."""
         if data_type == "interday":
             entry_datetime = None
         elif data_type == "intraday":
             entry_datetime = transformed_row["timestamp_UTC_s"]
 
-        filename = get_db_filename_for_date(transformer_data_type, self.tz, "EODHD", exchange, entry_datetime)
-        db_path = Path(config.RAW_HISTORICAL_DIR) / str(filename)
+        if span is not None and (entry_datetime is None or span[1] <= entry_datetime < span[2]):
+            return span
+
+        filename, start, end = get_db_file_span(f"historical_{data_type}", tz, "EODHD", exchange, entry_datetime)
+        return Path(config.RAW_HISTORICAL_DIR) / str(filename), start, end
 
+    def write_data(self, data_type: str, table_name: str, db_path: Path, transformed_rows: list[dict], test_mode: str):
+        """Write every row bound for one db file in a single batch (one writer transaction)."""
         if test_mode == "false":
-            emit({"db_path": db_path, "table": table_name, "row": transformed_row})
+            emit_many([{"db_path": db_path, "table": table_name, "row": row} for row in transformed_rows])
         elif test_mode == "local":
-            print({"db_path": db_path, "table": table_name, "row": transformed_row})
+            for transformed_row in transformed_rows:
+                logger.info("[%s] %s: %s", table_name, db_path, transformed_row)
         elif test_mode == "ci":
-            if data_type == "intraday":
-                expected = [
-                    ("timestamp_UTC_s", int),
-                    ("open", float),
-                    ("high", float),
-                    ("low", float),
-                    ("close", float),
-                    ("volume", int),
-                    ("interval", str),
-                ]
+            validate = _CI_VALIDATORS[data_type]
+            for transformed_row in transformed_rows:
+                validate(transformed_row)
 
-                assert len(transformed_row) == len(expected), "Length of transformed != length of expected"
-                for key, expected_type in expected:
-                    assert key in transformed_row, f"Missing key {key} in intraday data"
-                    assert isinstance(transformed_row[key], expected_type), (
-                        f"Key {key} has type {type(transformed_row[key]).__name__}, expected {expected_type.__name__}"
-                    )
-            elif data_type == "interday":
-                expected = [
-                    ("date", str),
-                    ("open", float),
-                    ("high", float),
-                    ("low", float),
-                    ("close", float),
-                    ("adjusted_close", float),
-                    ("volume", int),
-                    ("interval", str),
-                ]
+    def _parse_and_transform(
+        self,
+        body: bytes | list[dict],
+        data_type: str,
+        exchange: str,
+        tz: ZoneInfo,
+        ticker_exch: str,
+        interval: str,
+    ) -> Iterator[tuple[Path, list[dict]]]:
+        """Pure-CPU stage: decode the response body, transform rows and yield (db_path, rows) batches per db file."""
+        if isinstance(body, bytes):
+            try:
+                data = _loads(body)
+            except ValueError as e:
+                logger.warning("[%s] Invalid JSON in response: %s", ticker_exch, e)
+                return
+        else:
+            data = body
 
-                assert len(transformed_row) == len(expected), "Length of transformed != length of expected"
-                for key, expected_type in expected:
-                    assert key in transformed_row, f"Missing key {key} in intraday data"
-                    assert isinstance(transformed_row[key], expected_type), (
-                        f"Key {key} has type {type(transformed_row[key]).__name__}, expected {expected_type.__name__}"
-                    )
+        transform = _get_transformer(data_type, exchange)
+        span: tuple[Path, float, float] | None = None
 
-    def _fetch_data(self, ws_url: str, data_type: str, exchange: str, ticker: str, interval: str, test_mode: str):
-        transform = TransformData("EODHD", f"historical_{data_type}", "to_db_writer", exchange)
+        # Bucket rows by destination db file so each file is written as one batch
+        buckets: defaultdict[Path, list[dict]] = defaultdict(list)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        # The intraday/eod endpoints return a list; a bare object is the only other shape worth accepting
+        if type(data) is not list:
+            if not isinstance(data, dict):
+                logger.error("[%s] Unexpected data format: %s", ticker_exch, type(data).__name__)
+                return
+            data = [data]
+        if debug:
+            for row in data:
+                logger.debug("[%s] Received data: %s", ticker_exch, row)
+        # Transform one EMIT_CHUNK_ROWS slice at a time so full buckets are emitted while the rest is transformed
+        for start in range(0, len(data), EMIT_CHUNK_ROWS):
+            for transformed_row in transform.transform_many(data[start : start + EMIT_CHUNK_ROWS], interval):
+                span = self._db_span_for_row(data_type, exchange, tz, transformed_row, span)
+                db_path = span[0]
+                bucket = buckets[db_path]
+                bucket.append(transformed_row)
+                if len(bucket) >= EMIT_CHUNK_ROWS:
+                    yield db_path, bucket
+                    buckets[db_path] = []
+
+        for db_path, transformed_rows in buckets.items():
+            if transformed_rows:
+                yield db_path, transformed_rows
+
+    def _fetch_data(
+        self,
+        ws_url: str,
+        data_type: str,
+        exchange: str,
+        tz: ZoneInfo,
+        ticker: str,
+        ticker_exch: str,
+        interval: str,
+        test_mode: str,
+    ):
         table_name = ticker
         tried_ipv6 = False
+        body: bytes | list[dict]
 
         if test_mode == "ci":
             if data_type == "intraday":
-                data = [
+                body = [
                     {
                         "timestamp": 1751463000,
                         "gmtoffset": 0,
@@ -96,7 +284,7 @@ class EODHDHistoricalService(AbstractHistoricalService):
                     }
                 ]
             elif data_type == "interday":
-                data = [
+                body = [
                     {
                         "date": "2024-10-25",
                         "open": 534.65,
@@ -110,52 +298,35 @@ class EODHDHistoricalService(AbstractHistoricalService):
         else:
             while True:
                 try:
-                    resp = requests.get(ws_url, timeout=30)
-                    resp.raise_for_status()
-                    data = resp.json()
+                    body = _get_body(ws_url)
                     break
                 except Exception as e:
                     # If IPv4 is unreachable on an IPv6-only host, retry once forcing IPv6 resolution.
                     if not tried_ipv6:
                         tried_ipv6 = True
-                        prev_allowed = urllib3_connection.allowed_gai_family
                         try:
-                            urllib3_connection.allowed_gai_family = lambda: socket.AF_INET6
                             logger.info(
                                 "[%s] IPv4 fetch failed; retrying over IPv6 for %s",
-                                f"{ticker}.{exchange}",
+                                ticker_exch,
                                 ws_url,
                             )
-                            resp = requests.get(ws_url, timeout=30)
-                            resp.raise_for_status()
-                            data = resp.json()
+                            body = _get_body(ws_url, _IPV6_SESSION)
                             break
                         except Exception as retry_err:
                             logger.warning(
                                 "[%s] IPv6 retry failed for %s: %s",
-                                f"{ticker}.{exchange}",
+                                ticker_exch,
                                 ws_url,
                                 retry_err,
                             )
                             return
-                        finally:
-                            urllib3_connection.allowed_gai_family = prev_allowed
-                    logger.warning("[%s] HTTP error fetching %s: %s", f"{ticker}.{exchange}", ws_url, e)
+                    logger.warning("[%s] HTTP error fetching %s: %s", ticker_exch, ws_url, e)
                     return
 
-        if isinstance(data, list):
-            for row in data:
-                logger.debug("[%s] Received data: %s", f"{ticker}.{exchange}", row)
-                transformed_row = transform(row, interval)
-
-                self.write_data(data_type, table_name, exchange, transformed_row, test_mode)
-        elif isinstance(data, dict):
-            logger.debug("[%s] Received data: %s", f"{ticker}.{exchange}", data)
-            transformed_row = transform(data, interval)
-
-            self.write_data(data_type, table_name, exchange, transformed_row, test_mode)
-        else:
-            logger.error("[%s] Unexpected data format: %s", f"{ticker}.{exchange}", type(data).__name__)
+        for db_path, transformed_rows in self._parse_and_transform(
+            body, data_type, exchange, tz, ticker_exch, interval
+        ):
+            self.write_data(data_type, table_name, db_path, transformed_rows, test_mode)
 
     def start_historical_task(self, command: dict):
         TEST_SERVICES = os.getenv("TEST_SERVICES", "0") == "1"
@@ -180,31 +351,14 @@ class EODHDHistoricalService(AbstractHistoricalService):
         interval = command["interval"]
         api_token = eodhd_config.EODHD_API_TOKEN
 
-        tz_str = cast(str, eodhd_config.EXCHANGE_METADATA[exchange]["Timezone"])
-        self.tz = ZoneInfo(tz_str)
-
-        if interval in INTRADAY_FREQUENCIES:
-            data_type = "intraday"
-            start = str(tzstr_to_utcts(command["start"], "%Y-%m-%d %H:%M", self.tz))
-            end = str(tzstr_to_utcts(command["end"], "%Y-%m-%d %H:%M", self.tz))
-            url = (
-                f"https://eodhd.com/api/intraday/{ticker_exch}?api_token={api_token}"
-                f"&interval={interval}&from={start}&to={end}&fmt=json"
-            )
-
-        elif interval in INTERDAY_FREQUENCIES:
-            data_type = "interday"
-            start = validate_isodatestr(command["start"])
-            end = validate_isodatestr(command["end"])
+        tz = _tz_for(exchange)
 
-            url = (
-                f"https://eodhd.com/api/eod/{ticker_exch}?api_token={api_token}"
-                f"&period={interval}&from={start}&to={end}&fmt=json"
-            )
-
-        else:
-            raise ValueError(f"Unknown interval type: {interval}")
+        try:
+            data_type, build_url = _DISPATCH[interval]
+        except KeyError:
+            raise ValueError(f"Unknown interval type: {interval}") from None
+        url = build_url(ticker_exch, interval, command["start"], command["end"], tz, api_token)
 
         logger.info("Prepared historical task: type=%s ticker=%s interval=%s", data_type, ticker_exch, interval)
 
-        self._fetch_data(url, data_type, exchange, ticker, interval, test_mode)
+        self._fetch_data(url, data_type, exchange, tz, ticker, ticker_exch, interval, test_mode)
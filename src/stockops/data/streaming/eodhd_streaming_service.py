@@ -5,69 +5,205 @@ import logging
 import os
 import random
 import socket
-from pathlib import Path
-from typing import cast
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, cast
 from urllib.parse import urlparse, urlunparse
-from zoneinfo import ZoneInfo
 
 import websockets
 
 from stockops.config import config, eodhd_config
-from stockops.data.database.write_buffer import emit
+from stockops.data.database.write_buffer import emit_rows
 from stockops.data.transform import TransformData
-from stockops.data.utils import get_db_filename_for_date
+from stockops.data.utils import get_db_file_span, get_zoneinfo, make_ci_validator
 
 from .base_streaming_service import AbstractStreamingService
 
 logger = logging.getLogger(__name__)
 
+_BYTESLIKE = (bytes, bytearray)  # a prebuilt tuple, not a `bytes | bytearray` union rebuilt per isinstance call
+
+TRADES_URL = "wss://ws.eodhistoricaldata.com/ws/{exchange}?api_token={api_token}"
+QUOTES_URL = "wss://ws.eodhistoricaldata.com/ws/{exchange}-quote?api_token={api_token}"
+EMIT_BATCH_ROWS = 500  # ticks buffered before a pipelined emit_rows
+EMIT_FLUSH_INTERVAL_S = 1.0  # upper bound on how long a buffered tick waits for the writer
+MAX_PENDING_ROWS = 50_000  # cap on buffered ticks while an emit is in flight; beyond it new ticks are dropped
+TCP_KEEPIDLE_S = 30  # idle seconds before the first keepalive probe
+TCP_KEEPINTVL_S = 10  # seconds between unanswered probes
+TCP_KEEPCNT = 3  # unanswered probes before the connection is declared dead
+WS_MAX_QUEUE = 4096  # frames the websocket buffers ahead of the reader, so each loop wakeup drains more ticks
+HEARTBEAT_INTERVAL_S = 60.0  # seconds between INFO ingest summaries (per-tick payloads are DEBUG only)
+
+# Optional faster codecs: frames decode via simdjson, then orjson, then stdlib json; orjson also encodes
+# control messages
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# uvloop (optional, not on Windows) runs the stream's event loop on libuv; None keeps asyncio's default loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+_LOOP_FACTORY = uvloop.new_event_loop if uvloop is not None else None
+
+# simdjson parsers reuse their internal buffers but are not thread-safe; each stream thread gets its own
+_parsers = threading.local()
+
+
+def _simdjson_loads(frame: str | bytes) -> Any:
+    parser = getattr(_parsers, "parser", None)
+    if parser is None:
+        parser = _parsers.parser = simdjson.Parser()
+    # recursive=True hands back plain dicts/lists: the parsed frame outlives the parser's next parse()
+    return parser.parse(frame, recursive=True)
+
+
+# Chosen once at import, so the per-frame call goes straight to the decoder
+_loads: Callable[[str | bytes], Any] = (
+    _simdjson_loads if simdjson is not None else orjson.loads if orjson is not None else json.loads
+)
+
+
+def _dumps(obj: dict) -> str:
+    """Compact JSON text for outbound (text-frame) control messages."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _enable_tcp_keepalive(websocket: Any) -> None:
+    """Let the kernel detect a dead peer within ~TCP_KEEPIDLE_S + TCP_KEEPCNT * TCP_KEEPINTVL_S; best effort."""
+    transport = getattr(websocket, "transport", None)
+    sock = transport.get_extra_info("socket") if transport is not None else None
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # Per-socket tuning is platform specific (Linux names shown); skip whatever this OS lacks
+        for opt, val in (
+            ("TCP_KEEPIDLE", TCP_KEEPIDLE_S),
+            ("TCP_KEEPINTVL", TCP_KEEPINTVL_S),
+            ("TCP_KEEPCNT", TCP_KEEPCNT),
+        ):
+            if hasattr(socket, opt):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), val)
+    except OSError as e:
+        logger.debug("Could not tune TCP keepalive: %s", e)
+
+
+def _recv_takes_decode(websocket: Any) -> bool:
+    """websockets >= 13 connections accept recv(decode=False); older (legacy) protocols do not."""
+    try:
+        return "decode" in inspect.signature(websocket.recv).parameters
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+
+_CI_VALIDATORS = {
+    "streaming_trades": make_ci_validator([("timestamp_UTC_ms", int), ("price", float), ("volume", int)]),
+    "streaming_quotes": make_ci_validator(
+        [
+            ("timestamp_UTC_ms", int),
+            ("ask_price", float),
+            ("bid_price", float),
+            ("ask_size", int),
+            ("bid_size", int),
+        ]
+    ),
+}
+
+
+@lru_cache(maxsize=128)
+def _get_transformer(data_type: str, exchange: str) -> TransformData:
+    """TransformData instances are stateless after init; share one per (data_type, exchange) across streams."""
+    return TransformData("EODHD", data_type, "to_db_writer", exchange)
+
 
 class EODHDStreamingService(AbstractStreamingService):
-    def __init__(self):
-        pass
+    def __init__(self) -> None:
+        self._raw_dir = os.fspath(config.RAW_STREAMING_DIR)  # snapshot: streaming files stay put across reconnects
+        # Buffered ticks as (db_path, table, rows) runs: consecutive ticks for the same target share one run, so
+        # the write buffer serializes the db_path/table envelope once per run instead of once per tick
+        self._pending: list[tuple[str, str, list[dict]]] = []
+        self._run: tuple[str, str, list[dict]] | None = None  # last run in _pending, still being appended to
+        self._pending_count = 0
+        self._dropped = 0  # ticks shed because the pending buffer was full
+        # Set while a stream is running: wakes its flusher task early once a full batch is buffered
+        self._flush_now: asyncio.Event | None = None
+        # One worker of its own for emits: batches leave in order and never queue behind the loop's default executor
+        self._emit_executor: ThreadPoolExecutor | None = None
+        # exchange -> (db_path, start_ms, end_ms) of the streaming file that exchange's last tick went to
+        # (paths are kept as str: the write buffer serializes them as str anyway)
+        self._day_spans: dict[str, tuple[str, float, float]] = {}
+
+    def _take_pending(self) -> tuple[list[tuple[str, str, list[dict]]], int]:
+        pending, count = self._pending, self._pending_count
+        self._pending, self._run, self._pending_count = [], None, 0
+        return pending, count
+
+    def flush_pending(self) -> None:
+        """Push buffered ticks to the write buffer in one round trip."""
+        if not self._pending_count:
+            return
+        emit_rows(self._take_pending()[0])
+
+    async def _flush_pending_off_loop(self) -> None:
+        """flush_pending() for the event loop: the Redis round trip runs on the emit worker thread, not on the loop."""
+        if not self._pending_count:
+            return
+        pending, count = self._take_pending()
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._emit_executor, emit_rows, pending)
+        except Exception:
+            logger.exception("Failed to emit %d buffered row(s); dropping them", count)
 
     def write_data(self, table_name: str, exchange: str, transformed_row: dict, test_mode: str, data_type: str):
-        filename = get_db_filename_for_date(
-            "streaming", self.tz, "EODHD", exchange, transformed_row["timestamp_UTC_ms"]
-        )
-        db_path = Path(config.RAW_STREAMING_DIR) / str(filename)
+        # Streaming files are per local day: reuse the cached path until a tick falls outside that day
+        ts_ms = transformed_row["timestamp_UTC_ms"]
+        span = self._day_spans.get(exchange)
+        if span is None or not span[1] <= ts_ms < span[2]:
+            filename, start, end = get_db_file_span("streaming", self.tz, "EODHD", exchange, ts_ms)
+            span = (os.path.join(self._raw_dir, filename), start * 1000, end * 1000)
+            self._day_spans[exchange] = span
+        db_path = span[0]
 
         if test_mode == "false":
-            emit({"db_path": db_path, "table": table_name, "row": transformed_row})
+            if self._pending_count >= MAX_PENDING_ROWS:
+                # The write buffer is not keeping up: shed the tick rather than stall the websocket reader
+                self._dropped += 1
+                return
+            run = self._run
+            if run is None or run[0] != db_path or run[1] != table_name:
+                run = self._run = (db_path, table_name, [])
+                self._pending.append(run)
+            run[2].append(transformed_row)
+            self._pending_count += 1
+            if self._pending_count >= EMIT_BATCH_ROWS:
+                if self._flush_now is not None:
+                    self._flush_now.set()
+                else:
+                    self.flush_pending()
         elif test_mode == "local":
-            print({"db_path": db_path, "table": table_name, "row": transformed_row})
+            # Lazy %-args: the row is only formatted if a handler actually emits the record
+            logger.info("[%s] %s: %s", table_name, db_path, transformed_row)
         elif test_mode == "ci":
-            if data_type == "streaming_trades":
-                expected = [("timestamp_UTC_ms", int), ("price", float), ("volume", int)]
-
-                assert len(transformed_row) == len(expected), "Length of transformed != length of expected"
-                for key, expected_type in expected:
-                    assert key in transformed_row, f"Missing key {key} in intraday data"
-                    assert isinstance(transformed_row[key], expected_type), (
-                        f"Key {key} has type {type(transformed_row[key]).__name__}, expected {expected_type.__name__}"
-                    )
-            elif data_type == "streaming_quotes":
-                expected = [
-                    ("timestamp_UTC_ms", int),
-                    ("ask_price", float),
-                    ("bid_price", float),
-                    ("ask_size", int),
-                    ("bid_size", int),
-                ]
-
-                assert len(transformed_row) == len(expected), "Length of transformed != length of expected"
-                for key, expected_type in expected:
-                    assert key in transformed_row, f"Missing key {key} in intraday data"
-                    assert isinstance(transformed_row[key], expected_type), (
-                        f"Key {key} has type {type(transformed_row[key]).__name__}, expected {expected_type.__name__}"
-                    )
+            _CI_VALIDATORS[data_type](transformed_row)
 
     async def _stream_data(
         self, ws_url: str, stream_type: str, exchange: str, tickers: list[str], duration: int, test_mode: str
     ):
         table_name = "No Ticker Set"  # This pulls from actual returned data rather than tickers
         data_type = f"streaming_{stream_type}"
-        transform = TransformData("EODHD", data_type, "to_db_writer", exchange)
+        transform = _get_transformer(data_type, exchange).bind()
 
         assert len(tickers) == 1, (
             "Please modify eodhd_streaming_service:_stream_data code to loop over multiple tickers..."
@@ -75,9 +211,17 @@ class EODHDStreamingService(AbstractStreamingService):
 
         loop = asyncio.get_running_loop()
         started = loop.time()
+        deadline = None if duration is None else started + duration
         backoff = 1.0
         max_backoff = 60.0
         last_ipv6_url = None
+        # Debug gate read once per stream and refreshed on handshakes, so ticks skip logger.debug() entirely
+        debug = logger.isEnabledFor(logging.DEBUG)
+        ingested = 0
+        write_data = self.write_data  # bound once; process_parsed calls it per tick
+        # Same subscription on every (re)connect: encode it once
+        symbols = ",".join(tickers)
+        subscribe_frame = _dumps({"action": "subscribe", "symbols": symbols})
 
         async def run_stream(
             connect_url: str, *, server_hostname: str | None = None, host_header: str | None = None
@@ -98,13 +242,15 @@ class EODHDStreamingService(AbstractStreamingService):
                 ping_interval=45,
                 ping_timeout=45,
                 close_timeout=15,
-                max_queue=1000,
+                max_queue=WS_MAX_QUEUE,
                 max_size=None,
+                compression=None,  # tick frames are tiny: per-frame zlib inflate costs more CPU than it saves
                 server_hostname=server_hostname,
                 **connect_kwargs,
             ) as websocket:
                 # Successful connect → reset backoff
                 backoff = 1.0
+                _enable_tcp_keepalive(websocket)
 
                 # Wait (briefly) for an auth banner; if first frame is not a banner, buffer it
                 buffered_raw = None
@@ -112,50 +258,62 @@ class EODHDStreamingService(AbstractStreamingService):
                 try:
                     raw0 = await asyncio.wait_for(websocket.recv(), timeout=3)
                     try:
-                        parsed0 = json.loads(raw0)
-                    except json.JSONDecodeError:
+                        parsed0 = _loads(raw0)
+                    except ValueError:
                         parsed0 = None
                     if isinstance(parsed0, dict) and parsed0.get("status_code") == 200:
                         logger.info("[%s] Auth banner: %s", table_name, parsed0)
                     else:
                         buffered_raw, buffered_parsed = raw0, parsed0
-                        logger.debug("[%s] First frame not banner; buffering initial frame.", table_name)
+                        if debug:
+                            logger.debug("[%s] First frame not banner; buffering initial frame.", table_name)
                 except TimeoutError:
                     logger.debug("No auth banner within 3s; proceeding to subscribe.")
 
-                subscribe_msg = {"action": "subscribe", "symbols": ",".join(tickers)}
-                await websocket.send(json.dumps(subscribe_msg))
-                logger.info("Subscribed to [%s] on %s", ",".join(tickers), connect_url)
-
-                tl = time_left()
+                await websocket.send(subscribe_frame)
+                logger.info("Subscribed to [%s] on %s", symbols, connect_url)
 
                 async def run_read_loop(buf_raw, buf_parsed, data_type) -> None:
                     if buf_raw is not None and isinstance(buf_parsed, dict):
                         process_parsed(buf_parsed, buf_raw, data_type)
 
-                    async for message in websocket:
+                    # Fast locals for the per-frame path
+                    loads = _loads
+                    process = process_parsed
+
+                    def handle(message: str | bytes) -> None:
                         try:
-                            data = json.loads(message)
-                        except json.JSONDecodeError:
+                            data = loads(message)
+                        except ValueError:  # json/orjson JSONDecodeError
                             safe = (
                                 message.decode("utf-8", errors="replace")
-                                if isinstance(message, (bytes | bytearray))
+                                if isinstance(message, _BYTESLIKE)
                                 else str(message)
                             )
                             logger.warning("[%s] Non-JSON message: %s", table_name, safe)
-                            continue
-                        process_parsed(data, message, data_type)
+                            return
+                        process(data, message, data_type)
 
-                if tl and tl > 0:
-                    async with asyncio.timeout(tl):
-                        await run_read_loop(buffered_raw, buffered_parsed, data_type)
-                else:
+                    if _recv_takes_decode(websocket):
+                        # Hand the decoder each text frame's raw UTF-8 bytes instead of a freshly decoded str
+                        recv = websocket.recv
+                        try:
+                            while True:
+                                handle(await recv(decode=False))
+                        except websockets.exceptions.ConnectionClosedOK:
+                            return  # a clean close ends the read loop, as `async for` does
+                    else:
+                        async for message in websocket:
+                            handle(message)
+
+                # One absolute deadline for the whole stream (None = unbounded), however many reconnects happen
+                async with asyncio.timeout_at(deadline):
                     await run_read_loop(buffered_raw, buffered_parsed, data_type)
 
         def time_left() -> float | None:
-            if duration is None:
+            if deadline is None:
                 return None
-            return max(0.0, duration - (loop.time() - started))
+            return max(0.0, deadline - loop.time())
 
         async def maybe_retry(e: Exception, context: str) -> bool:
             """Returns True if we should retry, False if we should stop (duration exhausted)."""
@@ -164,7 +322,7 @@ class EODHDStreamingService(AbstractStreamingService):
             if tl is not None and tl <= 0:
                 logger.info("Duration exhausted after %s; stopping. Error: %s", context, e)
                 return False
-            jitter = random.uniform(0, 0.3 * backoff)
+            jitter = random.random() * (0.3 * backoff)
             delay = min(backoff + jitter, max_backoff)
             logger.warning("[%s] %s; retrying in %.1fs", table_name, context, delay)
             # If duration is bounded, don't sleep past it
@@ -176,19 +334,25 @@ class EODHDStreamingService(AbstractStreamingService):
 
         def process_parsed(data: dict, raw: str | bytes, data_type: str) -> None:
             """Process one already-parsed JSON dict."""
-            nonlocal table_name
-            if "status_code" in data and "message" in data:
-                logger.info("[%s] Handshake: %s", table_name, data)
-                return
+            nonlocal table_name, ingested, debug
+            # Ticks are nearly every frame: one dict lookup routes them; control frames take the slow branch
             s = data.get("s")
             if not s:
-                safe = raw.decode("utf-8", errors="replace") if isinstance(raw, (bytes | bytearray)) else str(raw)
+                if data.get("status_code") is not None and "message" in data:
+                    logger.info("[%s] Handshake: %s", table_name, data["message"])
+                    debug = logger.isEnabledFor(logging.DEBUG)
+                    if debug:
+                        logger.debug("[%s] Handshake frame: %s", table_name, data)
+                    return
+                safe = raw.decode("utf-8", errors="replace") if isinstance(raw, _BYTESLIKE) else str(raw)
                 logger.warning("[%s] Missing 's' in data; ignoring: %s", table_name, safe)
                 return
             table_name = s
-            logger.debug("[%s] Received: %s", table_name, data)
+            if debug:
+                logger.debug("[%s] Received: %s", table_name, data)
             transformed_row = transform(data)
-            self.write_data(table_name, exchange, transformed_row, test_mode, data_type)
+            write_data(table_name, exchange, transformed_row, test_mode, data_type)
+            ingested += 1
 
         mock_message: str = ""
         if test_mode == "ci":
@@ -198,72 +362,122 @@ class EODHDStreamingService(AbstractStreamingService):
                 mock_message = '{"s":"SPY","ap":657.6079,"as":5,"bp":657.5421,"bs":6,"t":1757623905553}'
             else:
                 raise ValueError(f"Unsupported data_type in CI: {data_type}")
-            data = json.loads(mock_message)
+            data = _loads(mock_message)
 
             process_parsed(data, mock_message, data_type)
             return  # Avoid falling into the live loop in ci mode
 
-        while True:
-            # Global duration gate
-            tl = time_left()
-            if tl is not None and tl <= 0:
-                logger.info("Stream duration elapsed; stopping.")
-                return
+        flush_now = self._flush_now = asyncio.Event()
+        emit_executor = self._emit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream-emit")
+        stopping = False
 
-            try:
-                logger.info("Connecting to %s", ws_url)
-                await run_stream(ws_url)
+        async def flush_periodically() -> None:
+            # Sole emitter while the stream runs, so batches reach the write buffer in tick order
+            next_heartbeat = loop.time() + HEARTBEAT_INTERVAL_S
+            reported = 0
+            while not stopping:
+                try:
+                    await asyncio.wait_for(flush_now.wait(), timeout=EMIT_FLUSH_INTERVAL_S)
+                except TimeoutError:
+                    pass
+                flush_now.clear()
+                await self._flush_pending_off_loop()
+                if loop.time() >= next_heartbeat:
+                    logger.info("[%s] Heartbeat: %d rows ingested (+%d)", table_name, ingested, ingested - reported)
+                    reported = ingested
+                    next_heartbeat += HEARTBEAT_INTERVAL_S
+                    if self._dropped:
+                        logger.warning("[%s] Dropped %d tick(s): write buffer backlog full", table_name, self._dropped)
+                        self._dropped = 0
+            await self._flush_pending_off_loop()
+            # Drops since the last heartbeat (including the final drain) would otherwise go unreported
+            if self._dropped:
+                logger.warning("[%s] Dropped %d tick(s): write buffer backlog full", table_name, self._dropped)
+                self._dropped = 0
+
+        flusher = asyncio.create_task(flush_periodically())
+        try:
+            while True:
+                # Global duration gate
+                tl = time_left()
+                if tl is not None and tl <= 0:
+                    logger.info("Stream duration elapsed; stopping.")
+                    return
 
-                # If we exit the read loop normally, loop back to reconnect unless duration expired
-                continue
+                try:
+                    logger.info("Connecting to %s", ws_url)
+                    await run_stream(ws_url)
 
-            except TimeoutError:
-                # This comes from asyncio.timeout(tl) expiring
-                logger.info("Read window expired.")
-                return
+                    # If we exit the read loop normally, loop back to reconnect unless duration expired
+                    continue
 
-            except (websockets.exceptions.ConnectionClosedError, websockets.exceptions.ConnectionClosedOK) as e:
-                if not await maybe_retry(e, "WebSocket closed"):
+                except TimeoutError:
+                    # This comes from asyncio.timeout_at(deadline) expiring
+                    logger.info("Read window expired.")
                     return
-                continue
-
-            except asyncio.CancelledError:
-                logger.info("[%s] Cancellation received; shutting down.", table_name)
-                raise
-
-            except Exception as e:
-                # If the first attempt failed, try a single IPv6 fallback (without forcing IPv6 permanently).
-                if last_ipv6_url is None and isinstance(
-                    e,
-                    OSError
-                    | websockets.InvalidURI
-                    | websockets.InvalidHandshake
-                    | websockets.exceptions.InvalidURI
-                    | websockets.exceptions.InvalidHandshake,
-                ):
-                    try:
-                        parsed = urlparse(ws_url)
-                        host = parsed.hostname
-                        if host:
-                            infos = socket.getaddrinfo(host, None, socket.AF_INET6, socket.SOCK_STREAM)
-                            if infos:
-                                ipv6 = infos[0][4][0]
-                                netloc = f"[{ipv6}]"
-                                if parsed.port:
-                                    netloc += f":{parsed.port}"
-                                last_ipv6_url = urlunparse(
-                                    (parsed.scheme, netloc, parsed.path, parsed.params, parsed.query, parsed.fragment)
+
+                except (websockets.exceptions.ConnectionClosedError, websockets.exceptions.ConnectionClosedOK) as e:
+                    if not await maybe_retry(e, "WebSocket closed"):
+                        return
+                    continue
+
+                except asyncio.CancelledError:
+                    logger.info("[%s] Cancellation received; shutting down.", table_name)
+                    raise
+
+                except Exception as e:
+                    # If the first attempt failed, try a single IPv6 fallback (without forcing IPv6 permanently).
+                    if last_ipv6_url is None and isinstance(
+                        e,
+                        OSError
+                        | websockets.InvalidURI
+                        | websockets.InvalidHandshake
+                        | websockets.exceptions.InvalidURI
+                        | websockets.exceptions.InvalidHandshake,
+                    ):
+                        try:
+                            parsed = urlparse(ws_url)
+                            host = parsed.hostname
+                            if host:
+                                # Resolved off the event loop (executor-backed), so the flusher keeps running
+                                infos = await loop.getaddrinfo(
+                                    host, None, family=socket.AF_INET6, type=socket.SOCK_STREAM
                                 )
-                                logger.info("Retrying with IPv6 literal: %s", last_ipv6_url)
-                                await run_stream(last_ipv6_url, server_hostname=host, host_header=host)
-                                continue
-                    except Exception as fallback_err:
-                        logger.warning("[%s] IPv6 fallback failed: %s", table_name, fallback_err)
-
-                logger.warning("[%s] Unexpected error: %s", table_name, repr(e))
-                if not await maybe_retry(e, "Unexpected error"):
-                    return
-                continue
+                                if infos:
+                                    ipv6 = infos[0][4][0]
+                                    netloc = f"[{ipv6}]"
+                                    if parsed.port:
+                                        netloc += f":{parsed.port}"
+                                    last_ipv6_url = urlunparse(parsed._replace(netloc=netloc))
+                                    logger.info("Retrying with IPv6 literal: %s", last_ipv6_url)
+                                    await run_stream(last_ipv6_url, server_hostname=host, host_header=host)
+                                    continue
+                        except Exception as fallback_err:
+                            logger.warning("[%s] IPv6 fallback failed: %s", table_name, fallback_err)
+
+                    logger.warning("[%s] Unexpected error: %s", table_name, repr(e))
+                    if not await maybe_retry(e, "Unexpected error"):
+                        return
+                    continue
+        finally:
+            # Let the flusher drain what is still buffered (and finish any in-flight emit) before returning
+            stopping = True
+            flush_now.set()
+
+            def release_emitter(_: object = None) -> None:
+                self._flush_now = None
+                self._emit_executor = None
+                emit_executor.shutdown(wait=True)  # idle by now: only called once the flusher is done
+
+            try:
+                # Shielded: a repeated cancel during shutdown must not cancel the final drain along with this task
+                await asyncio.shield(flusher)
+            finally:
+                if flusher.done():
+                    release_emitter()
+                else:
+                    # Interrupted again: the flusher finishes its drain on its own, then releases the emit worker
+                    flusher.add_done_callback(release_emitter)
 
     def start_stream(self, command: dict):
         TEST_SERVICES = os.getenv("TEST_SERVICES", "0") == "1"
@@ -288,13 +502,17 @@ class EODHDStreamingService(AbstractStreamingService):
         stream_type = command["stream_type"]
 
         if stream_type == "trades":
-            url = f"wss://ws.eodhistoricaldata.com/ws/{exchange}?api_token={eodhd_config.EODHD_API_TOKEN}"
+            url = TRADES_URL.format(exchange=exchange, api_token=eodhd_config.EODHD_API_TOKEN)
         elif stream_type == "quotes":
-            url = f"wss://ws.eodhistoricaldata.com/ws/{exchange}-quote?api_token={eodhd_config.EODHD_API_TOKEN}"
+            url = QUOTES_URL.format(exchange=exchange, api_token=eodhd_config.EODHD_API_TOKEN)
         else:
             raise ValueError(f"Unknown stream type: {stream_type}")
 
         tz_str = cast(str, eodhd_config.EXCHANGE_METADATA[exchange.upper()]["Timezone"])
-        self.tz = ZoneInfo(tz_str)
+        self.tz = get_zoneinfo(tz_str)
+        self._day_spans.pop(exchange.upper(), None)  # recomputed against this stream's timezone
 
-        asyncio.run(self._stream_data(url, stream_type, exchange.upper(), tickers, duration, test_mode))
+        asyncio.run(
+            self._stream_data(url, stream_type, exchange.upper(), tickers, duration, test_mode),
+            loop_factory=_LOOP_FACTORY,
+        )
@@ -1,19 +1,57 @@
 import logging
+from collections.abc import Callable
+from operator import itemgetter
+
+import numpy as np
 
 from stockops.config import utils as cfg_utils  # , add additional providers here as needed
-from stockops.data.utils import validate_isodatestr, validate_utc_ts
+from stockops.data.utils import validate_isodatestr, validate_isodatestrs, validate_utc_ts
 
 logger = logging.getLogger(__name__)
 
+# Pass-through value fields, extracted per row with a single C-level itemgetter call
+_INTERDAY_FIELDS = ("open", "high", "low", "close", "adjusted_close", "volume")
+_INTRADAY_FIELDS = ("open", "high", "low", "close", "volume")
+_get_interday_fields = itemgetter(*_INTERDAY_FIELDS)
+_get_intraday_fields = itemgetter(*_INTRADAY_FIELDS)
+
+# Required input keys per data_type, checked per row with a C-level subset test against dict.keys()
+_INTERDAY_REQUIRED = frozenset({"date", *_INTERDAY_FIELDS})
+_INTRADAY_REQUIRED = frozenset({"timestamp", *_INTRADAY_FIELDS})
+_TRADES_REQUIRED = frozenset({"t", "p", "v"})
+_QUOTES_REQUIRED = frozenset({"t", "ap", "bp", "as", "bs"})
+
+# transform_many: data_type -> (required keys, pass-through fields, input key column, output key column)
+_BATCH_SCHEMAS: dict[str, tuple[frozenset[str], tuple[str, ...], str, str]] = {
+    "historical_intraday": (_INTRADAY_REQUIRED, _INTRADAY_FIELDS, "timestamp", "timestamp_UTC_s"),
+    "historical_interday": (_INTERDAY_REQUIRED, _INTERDAY_FIELDS, "date", "date"),
+}
+# (provider, target, data_type) -> per-row transform method, resolved once per instance
+_HANDLERS: dict[tuple[str, str, str], str] = {
+    ("EODHD", "to_db_writer", "historical_interday"): "_eodhd_historical_interday",
+    ("EODHD", "to_db_writer", "historical_intraday"): "_eodhd_historical_intraday",
+    ("EODHD", "to_db_writer", "streaming_trades"): "_eodhd_streaming_trades",
+    ("EODHD", "to_db_writer", "streaming_quotes"): "_eodhd_streaming_quotes",
+}
+# data_type -> output column order of the transformed row (to_db_writer target)
+_COLUMNS: dict[str, tuple[str, ...]] = {
+    "historical_interday": ("date", *_INTERDAY_FIELDS, "interval"),
+    "historical_intraday": ("timestamp_UTC_s", *_INTRADAY_FIELDS, "interval"),
+    "streaming_trades": ("timestamp_UTC_ms", "price", "volume"),
+    "streaming_quotes": ("timestamp_UTC_ms", "ask_price", "bid_price", "ask_size", "bid_size"),
+}
+
 
 class TransformData:
     def __init__(self, provider: str, data_type: str, target: str, exchange: str = "US"):
         self.provider = provider
         self.data_type = data_type
         self.target = target
-        self.cfg_utils = cfg_utils.ProviderConfig(provider, exchange)
+        self.cfg_utils = cfg_utils.get_provider_config(provider, exchange)
         self.tz_str = self.cfg_utils.tz_str
         self.freq_interday, self.freq_intraday = self.set_freqs()
+        self._handler = self._resolve_handler()
+        self.columns = _COLUMNS[data_type]
 
     def set_freqs(self):
         if self.provider == "EODHD":
@@ -22,76 +60,142 @@ class TransformData:
 
     def __call__(self, data_row: dict, interval: str = ""):
         """Note: dtypes selected for sql storage efficiency based on expected values"""
-        if self.provider == "EODHD":
-            return self.eodhd(data_row, interval)
-        raise ValueError(f"Unsupported provider: {self.provider}")
-
-    def eodhd(self, data_row: dict, interval: str) -> dict:
-        if self.target == "to_db_writer":
-            if self.data_type == "historical_interday":
-                required_keys = {"date", "open", "high", "low", "close", "adjusted_close", "volume"}
-
-                missing = required_keys - data_row.keys()
-                if missing:
-                    logger.debug("Missing expected fields in historical_interday EODHD data: %s", missing)
-                    raise
-
-                assert interval in self.freq_interday, "Invalid interday interval for this provider."
-
-                transformed = {
-                    "date": validate_isodatestr(data_row["date"]),
-                    **{k: data_row[k] for k in ("open", "high", "low", "close", "adjusted_close", "volume")},
-                    "interval": interval,
-                }
-
-            elif self.data_type == "historical_intraday":
-                required_keys = {"timestamp", "open", "high", "low", "close", "volume"}
-
-                missing = required_keys - data_row.keys()
-                if missing:
-                    logger.debug("Missing expected fields in historical_intraday EODHD data: %s", missing)
-                    raise
-
-                assert interval in self.freq_intraday, "Invalid intraday interval for this provider."
-
-                transformed = {
-                    "timestamp_UTC_s": validate_utc_ts(data_row["timestamp"], precision="s"),
-                    **{k: data_row[k] for k in ("open", "high", "low", "close", "volume")},
-                    "interval": interval,
-                }
-
-            elif self.data_type == "streaming_trades":
-                required_keys = {"t", "p", "v"}
-
-                missing = required_keys - data_row.keys()
-                if missing:
-                    logger.debug("Missing expected fields in streaming_trades EODHD data: %s", missing)
-                    raise
-
-                assert interval == "", "Interval invalid for spot data."
-
-                transformed = {
-                    "timestamp_UTC_ms": validate_utc_ts(data_row["t"], precision="ms"),
-                    "price": data_row["p"],
-                    "volume": data_row["v"],
-                }
-
-            elif self.data_type == "streaming_quotes":
-                required_keys = {"t", "ap", "bp", "as", "bs"}
-
-                missing = required_keys - data_row.keys()
-                if missing:
-                    logger.debug("Missing expected fields in streaming_quotes EODHD data: %s", missing)
-                    raise
-
-                assert interval == "", "Interval invalid for spot data."
-
-                transformed = {
-                    "timestamp_UTC_ms": validate_utc_ts(data_row["t"], precision="ms"),
-                    "ask_price": data_row["ap"],
-                    "bid_price": data_row["bp"],
-                    "ask_size": data_row["as"],
-                    "bid_size": data_row["bs"],
-                }
-
-        return transformed
+        return self._handler(data_row, interval)
+
+    def bind(self) -> Callable[[dict], dict]:
+        """
+        Per-row transform specialized for this instance's provider/data_type/target, for callers that transform
+        one row at a time in a hot loop (streaming ticks). Fields are read directly with no up-front key check;
+        a row missing one (KeyError) defers to __call__ for the usual errors.
+        """
+        if self.provider == "EODHD" and self.target == "to_db_writer":
+            if self.data_type == "streaming_trades":
+
+                def transform_trade(data_row: dict) -> dict:
+                    try:
+                        return {
+                            "timestamp_UTC_ms": validate_utc_ts(data_row["t"], precision="ms"),
+                            "price": data_row["p"],
+                            "volume": data_row["v"],
+                        }
+                    except KeyError:
+                        return self(data_row)
+
+                return transform_trade
+
+            if self.data_type == "streaming_quotes":
+
+                def transform_quote(data_row: dict) -> dict:
+                    try:
+                        return {
+                            "timestamp_UTC_ms": validate_utc_ts(data_row["t"], precision="ms"),
+                            "ask_price": data_row["ap"],
+                            "bid_price": data_row["bp"],
+                            "ask_size": data_row["as"],
+                            "bid_size": data_row["bs"],
+                        }
+                    except KeyError:
+                        return self(data_row)
+
+                return transform_quote
+
+        return self.__call__
+
+    def transform_many(self, data_rows: list[dict], interval: str = "") -> list[dict]:
+        """
+        Column-wise counterpart of __call__ for historical EODHD batches: keys are checked once per batch and
+        timestamps/dates are validated as whole columns. Anything else goes through the per-row path.
+        """
+        if self.provider != "EODHD" or self.target != "to_db_writer" or not data_rows:
+            return [self(row, interval) for row in data_rows]
+
+        schema = _BATCH_SCHEMAS.get(self.data_type)
+        if schema is None:
+            return [self(row, interval) for row in data_rows]
+        required, fields, key_col, out_key = schema
+        freqs = self.freq_intraday if self.data_type == "historical_intraday" else self.freq_interday
+
+        # Malformed rows keep the exact per-row failure behavior
+        if not all(required <= row.keys() for row in data_rows):
+            return [self(row, interval) for row in data_rows]
+
+        assert interval in freqs, f"Invalid {self.data_type.split('_')[1]} interval for this provider."
+
+        keys = [row[key_col] for row in data_rows]
+        if out_key == "timestamp_UTC_s":
+            ts = np.asarray(keys)
+            if ts.dtype.kind != "i":
+                raise TypeError(f"Timestamp must be int, got {ts.dtype}")
+            # Validity is a contiguous range, so checking the extremes covers the column
+            validate_utc_ts(int(ts.min()), precision="s")
+            validate_utc_ts(int(ts.max()), precision="s")
+        else:
+            validate_isodatestrs(keys)
+
+        # Value fields pass through unchanged, exactly as in the per-row path
+        columns: list[list] = [keys, *map(list, zip(*map(itemgetter(*fields), data_rows), strict=True))]
+        columns.append([interval] * len(data_rows))
+        out_keys = self.columns
+        return [dict(zip(out_keys, vals, strict=True)) for vals in zip(*columns, strict=True)]
+
+    def _resolve_handler(self) -> Callable[[dict, str], dict]:
+        """Pick the per-row transform for this provider/target/data_type once, so __call__ is one indirect call."""
+        name = _HANDLERS.get((self.provider, self.target, self.data_type))
+        if name is None:
+            raise ValueError(f"Unsupported {self.provider} transform: target={self.target}, data_type={self.data_type}")
+        return getattr(self, name)
+
+    def _missing_fields(self, required: frozenset[str], data_row: dict) -> None:
+        missing = required - data_row.keys()
+        logger.debug("Missing expected fields in %s %s data: %s", self.data_type, self.provider, missing)
+        raise
+
+    def _eodhd_historical_interday(self, data_row: dict, interval: str) -> dict:
+        if not _INTERDAY_REQUIRED <= data_row.keys():
+            self._missing_fields(_INTERDAY_REQUIRED, data_row)
+
+        assert interval in self.freq_interday, "Invalid interday interval for this provider."
+
+        return {
+            "date": validate_isodatestr(data_row["date"]),
+            **dict(zip(_INTERDAY_FIELDS, _get_interday_fields(data_row), strict=True)),
+            "interval": interval,
+        }
+
+    def _eodhd_historical_intraday(self, data_row: dict, interval: str) -> dict:
+        if not _INTRADAY_REQUIRED <= data_row.keys():
+            self._missing_fields(_INTRADAY_REQUIRED, data_row)
+
+        assert interval in self.freq_intraday, "Invalid intraday interval for this provider."
+
+        return {
+            "timestamp_UTC_s": validate_utc_ts(data_row["timestamp"], precision="s"),
+            **dict(zip(_INTRADAY_FIELDS, _get_intraday_fields(data_row), strict=True)),
+            "interval": interval,
+        }
+
+    def _eodhd_streaming_trades(self, data_row: dict, interval: str) -> dict:
+        if not _TRADES_REQUIRED <= data_row.keys():
+            self._missing_fields(_TRADES_REQUIRED, data_row)
+
+        assert interval == "", "Interval invalid for spot data."
+
+        return {
+            "timestamp_UTC_ms": validate_utc_ts(data_row["t"], precision="ms"),
+            "price": data_row["p"],
+            "volume": data_row["v"],
+        }
+
+    def _eodhd_streaming_quotes(self, data_row: dict, interval: str) -> dict:
+        if not _QUOTES_REQUIRED <= data_row.keys():
+            self._missing_fields(_QUOTES_REQUIRED, data_row)
+
+        assert interval == "", "Interval invalid for spot data."
+
+        return {
+            "timestamp_UTC_ms": validate_utc_ts(data_row["t"], precision="ms"),
+            "ask_price": data_row["ap"],
+            "bid_price": data_row["bp"],
+            "ask_size": data_row["as"],
+            "bid_size": data_row["bs"],
+        }
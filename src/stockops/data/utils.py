@@ -1,10 +1,16 @@
 import math
-from datetime import UTC, date, datetime
+from collections import deque
+from collections.abc import Callable, Iterable
+from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache
 from typing import TypedDict, cast
 from zoneinfo import ZoneInfo
 
 from stockops.data.database.utils import period_from_unix
 
+# Seconds range datetime.fromtimestamp accepts (0001-01-01 .. 9999-12-31 23:59:59 UTC), checked as plain ints
+_MIN_UTC_TS_S = -62_135_596_800
+_MAX_UTC_TS_S = 253_402_300_799
 _MONTHS = ("0", "JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
 
 
@@ -17,6 +23,12 @@ class DBFilenameParts(TypedDict):
     day: str | None
 
 
+@lru_cache(maxsize=64)
+def get_zoneinfo(tz_str: str) -> ZoneInfo:
+    """Shared, memoized ZoneInfo lookup; exchanges map to a handful of zones reused by every task."""
+    return ZoneInfo(tz_str)
+
+
 def parse_db_filename(filename: str) -> DBFilenameParts:
     if not filename.endswith(".db"):
         raise ValueError(f"Not a valid DB filename: {filename}")
@@ -44,6 +56,7 @@ def parse_db_filename(filename: str) -> DBFilenameParts:
     }
 
 
+@lru_cache(maxsize=256)
 def get_standard_db_filename(
     data_type: str, provider: str, exchange: str, y: str | None = None, m: str | None = None, d: str | None = None
 ) -> str:
@@ -76,6 +89,27 @@ def get_db_filename_for_date(
     raise ValueError(f"Unsupported data_type: {data_type!r}")
 
 
+def get_db_file_span(
+    data_type: str, tz: ZoneInfo, provider: str, exchange: str, entry_datetime: int | None
+) -> tuple[str, float, float]:
+    """
+    Like get_db_filename_for_date, but also return the [start, end) span in UTC seconds covered by that file,
+    so callers can reuse the filename for every row inside the span instead of recomputing it per row.
+    """
+    filename = get_db_filename_for_date(data_type, tz, provider, exchange, entry_datetime)
+    if data_type == "historical_interday" or entry_datetime is None:
+        return filename, -math.inf, math.inf
+
+    dt = datetime.fromtimestamp(normalize_ts_to_seconds(entry_datetime), tz=UTC).astimezone(tz)
+    if data_type == "historical_intraday":
+        start = datetime(dt.year, dt.month, 1, tzinfo=tz)
+        end = datetime(dt.year + dt.month // 12, dt.month % 12 + 1, 1, tzinfo=tz)
+    else:
+        start = datetime(dt.year, dt.month, dt.day, tzinfo=tz)
+        end = datetime.combine(start.date() + timedelta(days=1), start.timetz())
+    return filename, start.timestamp(), end.timestamp()
+
+
 def get_filenames_for_dates(
     data_type: str, tz: ZoneInfo, provider: str, exchange: str, daterange_endpts: tuple[str | int, str | int]
 ) -> list[str]:
@@ -136,8 +170,14 @@ def utcts_to_tzstr_parsed(value: int | float, tz: ZoneInfo) -> tuple[str, str, s
     return (str(dt.year), _MONTHS[dt.month], f"{dt.day:02d}")
 
 
+@lru_cache(maxsize=1024)
 def tzstr_to_utcts(dt_str: str, format: str, tz: ZoneInfo) -> int:
-    return int(datetime.strptime(dt_str, format).replace(tzinfo=tz).timestamp())
+    # Fast path for the "YYYY-MM-DD HH:MM" form used by the schedulers: fromisoformat is C-level, strptime is not
+    if format == "%Y-%m-%d %H:%M" and len(dt_str) == 16 and dt_str[4] + dt_str[7] + dt_str[10] + dt_str[13] == "-- :":
+        dt = datetime.fromisoformat(dt_str)
+    else:
+        dt = datetime.strptime(dt_str, format)
+    return int(dt.replace(tzinfo=tz).timestamp())
 
 
 def utcts_to_tzstr(ts: int | float, format: str, tz: ZoneInfo) -> str:
@@ -154,6 +194,14 @@ def validate_isodatestr(s: str) -> str:
     return s
 
 
+def validate_isodatestrs(values: Iterable[str]) -> None:
+    """
+    Column-wise validate_isodatestr(): the same date.fromisoformat check, driven by map() so a batch pays no
+    per-value Python call frame. Raises on the first invalid value.
+    """
+    deque(map(date.fromisoformat, values), maxlen=0)
+
+
 def validate_utc_ts(ts: int, precision: str) -> int:
     """
     Ensure ts is an integer Unix timestamp in UTC.
@@ -163,9 +211,28 @@ def validate_utc_ts(ts: int, precision: str) -> int:
         raise TypeError(f"Timestamp must be int, got {type(ts).__name__}")
 
     if precision == "s":
-        datetime.fromtimestamp(ts, tz=UTC)
+        lo, hi = _MIN_UTC_TS_S, _MAX_UTC_TS_S
     elif precision == "ms":
-        datetime.fromtimestamp(ts / 1000.0, tz=UTC)
+        lo, hi = _MIN_UTC_TS_S * 1000, _MAX_UTC_TS_S * 1000 + 999
     else:
         raise ValueError(f"Unsupported precision {precision!r}, expected 's' or 'ms'")
+    if not lo <= ts <= hi:
+        raise ValueError(f"Out-of-range Unix timestamp ({precision}): {ts}")
     return ts
+
+
+def make_ci_validator(spec: list[tuple[str, type]]) -> Callable[[dict], None]:
+    """Row validator for CI mode: one straight-line check on success; detailed assertions only on failure."""
+    keys = frozenset(k for k, _ in spec)
+
+    def validate(transformed_row: dict) -> None:
+        if transformed_row.keys() == keys and all(isinstance(transformed_row[k], t) for k, t in spec):
+            return
+        assert len(transformed_row) == len(spec), "Length of transformed != length of expected"
+        for key, expected_type in spec:
+            assert key in transformed_row, f"Missing key {key} in intraday data"
+            assert isinstance(transformed_row[key], expected_type), (
+                f"Key {key} has type {type(transformed_row[key]).__name__}, expected {expected_type.__name__}"
+            )
+
+    return validate
@@ -0,0 +1,75 @@
+import itertools
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from stockops.data.database.sql_db import SQLiteWriter
+
+pytestmark = pytest.mark.integration
+
+TABLE = "SPY"
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    return tmp_path / "stream.db"
+
+
+@pytest.fixture
+def insert(db_path: Path):
+    """insert(*rows) -> acked msg ids; one insert_many batch of streaming rows into TABLE."""
+    writer = SQLiteWriter()
+    msg_ids = (f"{n}-0" for n in itertools.count(1))
+
+    def _insert(*rows: dict) -> list[str]:
+        batch = [(next(msg_ids), {"db_path": str(db_path), "table": TABLE, "row": row}) for row in rows]
+        return writer.insert_many(db_path, TABLE, batch, "EODHD", "US", "streaming")
+
+    yield _insert
+    writer.close()
+
+
+def _stored(db_path: Path) -> list[tuple]:
+    """(timestamp, version, price) for every stored row."""
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            f'SELECT "timestamp_UTC_ms", "version", "price" FROM "{TABLE}" ORDER BY "timestamp_UTC_ms", "version"'
+        ).fetchall()
+
+
+def test_exact_duplicates_are_acked_not_inserted(db_path: Path, insert):
+    row = {"timestamp_UTC_ms": 1, "price": 2.5}
+
+    assert len(insert(row, dict(row))) == 2
+    assert len(insert(dict(row))) == 1
+    assert _stored(db_path) == [(1, 1, 2.5)]
+
+
+def test_changed_rows_get_the_next_version(db_path: Path, insert):
+    insert({"timestamp_UTC_ms": 1, "price": 2.5})
+    insert({"timestamp_UTC_ms": 1, "price": 3.0}, {"timestamp_UTC_ms": 1, "price": 3.5})
+
+    assert _stored(db_path) == [(1, 1, 2.5), (1, 2, 3.0), (1, 3, 3.5)]
+
+
+def test_duplicates_compare_values_as_stored(db_path: Path, insert):
+    # Mixed str/int values declare "price" as TEXT, so the int 7 is stored as the text '7'
+    rows = ({"timestamp_UTC_ms": 1, "price": "a"}, {"timestamp_UTC_ms": 2, "price": 7})
+    insert(*rows)
+    insert(*(dict(r) for r in rows))
+
+    assert _stored(db_path) == [(1, 1, "a"), (2, 1, "7")]
+
+
+def test_rejected_rows_take_no_version(db_path: Path, insert):
+    # A list cannot be bound: the bulk insert fails and the batch is replayed row by row
+    ack = insert(
+        {"timestamp_UTC_ms": 1, "price": 1.0},
+        {"timestamp_UTC_ms": 1, "price": [1.5]},
+        {"timestamp_UTC_ms": 1, "price": 2.0},
+        {"timestamp_UTC_ms": 1, "price": 2.0},
+    )
+
+    assert len(ack) == 4  # rejected rows are acked (and logged) rather than redelivered
+    assert _stored(db_path) == [(1, 1, 1.0), (1, 2, 2.0)]
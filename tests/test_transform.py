@@ -0,0 +1,70 @@
+import pytest
+
+from stockops.config import eodhd_config
+from stockops.data.transform import TransformData
+
+# TransformData reads exchange metadata, which eodhd_config only defines when EODHD_API_TOKEN is set
+if not hasattr(eodhd_config, "EXCHANGE_METADATA"):
+    pytest.skip("EODHD_API_TOKEN is not set", allow_module_level=True)
+
+
+def _interday_row(date: str, **overrides) -> dict:
+    row = {
+        "date": date,
+        "open": 534.65,
+        "high": 537,
+        "low": 531.414,
+        "close": 532.26,
+        "adjusted_close": 527.1013,
+        "volume": 4327190,
+    }
+    row.update(overrides)
+    return row
+
+
+def _intraday_row(ts: int, **overrides) -> dict:
+    row = {"timestamp": ts, "open": 617.23999, "high": 618, "low": 616.609985, "close": 618.599975, "volume": 11824245}
+    row.update(overrides)
+    return row
+
+
+def _assert_same_rows(batch: list[dict], per_row: list[dict]) -> None:
+    assert batch == per_row
+    # == treats 1 and 1.0 alike; the two paths must also agree on the value types
+    assert [{k: type(v) for k, v in r.items()} for r in batch] == [{k: type(v) for k, v in r.items()} for r in per_row]
+
+
+@pytest.mark.parametrize(
+    "data_type, interval, rows",
+    [
+        (
+            "historical_interday",
+            "d",
+            [_interday_row("2024-10-24"), _interday_row("2024-10-25", open=None, close=None)],
+        ),
+        (
+            "historical_intraday",
+            "1m",
+            [_intraday_row(1751463000), _intraday_row(1751463060, open=None, close=None)],
+        ),
+    ],
+)
+def test_transform_many_matches_per_row(data_type: str, interval: str, rows: list[dict]):
+    transform = TransformData("EODHD", data_type, "to_db_writer")
+    batch = transform.transform_many(rows, interval)
+    per_row = [transform(row, interval) for row in rows]
+
+    _assert_same_rows(batch, per_row)
+    # Values pass through unchanged on both paths: null prices stay None and integral prices stay ints
+    assert batch[1]["open"] is None and batch[1]["close"] is None
+    assert type(batch[0]["high"]) is int
+
+
+@pytest.mark.parametrize("price", [True, "2.5"])
+def test_transform_many_matches_per_row_for_non_float_prices(price):
+    transform = TransformData("EODHD", "historical_interday", "to_db_writer")
+    rows = [_interday_row("2024-10-24", close=1.5), _interday_row("2024-10-25", close=price)]
+
+    batch = transform.transform_many(rows, "d")
+    _assert_same_rows(batch, [transform(row, "d") for row in rows])
+    assert batch[1]["close"] is price